@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+Dedupe benchmark suite
+Builds synthetic content_ideas databases with a controlled near-duplicate
+rate, then measures save_idea, check_duplicates and keyword_similarity with
+the offline (hashing) embedding backend
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import string
+import resource
+import tempfile
+import subprocess
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Tuple
+from embeddings import GEMINI_EMBED_DIM
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+RESULTS_DIR = os.path.join(HERE, "benchmarks")
+
+DEFAULT_SIZES = [1000, 10000, 100000]
+
+# Seed rows embedded and inserted per transaction (bounds the seeding RSS)
+SEED_CHUNK = 1000
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(int(round(pct / 100.0 * len(ordered) + 0.5)) - 1, 0)
+    return ordered[min(rank, len(ordered) - 1)]
+
+def latency_stats(seconds: List[float]) -> Dict:
+    """p50/p95/p99/max in ms plus calls per second"""
+    total = sum(seconds)
+    return {
+        "p50_ms": round(percentile(seconds, 50) * 1000, 3),
+        "p95_ms": round(percentile(seconds, 95) * 1000, 3),
+        "p99_ms": round(percentile(seconds, 99) * 1000, 3),
+        "max_ms": round(max(seconds, default=0.0) * 1000, 3),
+        "per_sec": round(len(seconds) / total, 1) if total else 0.0,
+    }
+
+class CorpusGenerator:
+    """Synthetic ideas from a fixed vocabulary; near-duplicates are light edits"""
+
+    def __init__(self, seed: int = 0, vocab_size: int = 5000):
+        self.rng = random.Random(seed)
+        words = set()
+        while len(words) < vocab_size:
+            words.add("".join(self.rng.choice(string.ascii_lowercase) for _ in range(self.rng.randint(4, 9))))
+        self.vocab = sorted(words)
+        self.tags = self.vocab[:50]
+
+    def idea(self) -> Dict:
+        """A fresh idea"""
+        return {
+            "title": " ".join(self.rng.sample(self.vocab, self.rng.randint(4, 7))),
+            "summary": " ".join(self.rng.sample(self.vocab, self.rng.randint(10, 20))),
+            "tags": ",".join(self.rng.sample(self.tags, 2)),
+            "type": "short",
+        }
+
+    def near_duplicate(self, original: Dict) -> Dict:
+        """Reword an idea: swap one title word, drop/replace a few summary words"""
+        title = original["title"].split()
+        title[self.rng.randrange(len(title))] = self.rng.choice(self.vocab)
+        summary = original["summary"].split()
+        for _ in range(2):
+            summary[self.rng.randrange(len(summary))] = self.rng.choice(self.vocab)
+        self.rng.shuffle(summary)
+        return {
+            "title": " ".join(title),
+            "summary": " ".join(summary),
+            "tags": original["tags"],
+            "type": original["type"],
+        }
+
+def seed_database(pipeline, db, ideas: List[Dict]) -> float:
+    """Bulk-insert ideas (bypassing save_idea) and build the index; returns seconds"""
+    backend = pipeline.embeddings.get_backend()
+    started = time.perf_counter()
+    day = date(2000, 1, 1)
+
+    for start in range(0, len(ideas), SEED_CHUNK):
+        chunk = ideas[start:start + SEED_CHUNK]
+        vectors = backend.embed([f"{i['title']} {i['summary']}" for i in chunk])
+        rows = []
+        for n, (idea, vector) in enumerate(zip(chunk, vectors), start):
+            id_date = (day + timedelta(days=n // 999)).isoformat()
+            rows.append((
+                f"{id_date}-{n % 999 + 1:03d}", id_date, idea["type"], idea["title"], f"seed-{n}",
+                idea["summary"], idea["tags"], "pitched",
+                pipeline.encode_embedding(vector), pipeline.EMBEDDING_FORMAT_F32, backend.model,
+                *pipeline.encode_keyword_features(pipeline.keyword_features(idea)),
+            ))
+
+        with db.transaction() as conn:
+            conn.executemany("""
+                INSERT INTO content_ideas
+                (id, date, type, title, slug, summary, tags, status, embedding, embedding_format,
+                 embedding_model, title_tokens, summary_tokens, tag_tokens)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, rows)
+
+    pipeline.rebuild_index()
+    return time.perf_counter() - started
+
+def run_size(size: int, dup_rate: float, queries: int) -> Dict:
+    """One benchmark run in this process (IDEAS_DB_PATH must point at a scratch DB)"""
+    import db
+    import pipeline
+
+    gen = CorpusGenerator(seed=size)
+    seeded = [gen.idea() for _ in range(size)]
+
+    pipeline.init_db()
+    seed_seconds = seed_database(pipeline, db, seeded)
+
+    # Queries: dup_rate of them reword a seeded idea, the rest are fresh
+    labelled: List[Tuple[Dict, bool]] = []
+    for _ in range(queries):
+        if gen.rng.random() < dup_rate:
+            labelled.append((gen.near_duplicate(gen.rng.choice(seeded)), True))
+        else:
+            labelled.append((gen.idea(), False))
+
+    # check_duplicates: first call pays the cold index/metadata load
+    timings, tp, fp, fn = [], 0, 0, 0
+    cold_started = time.perf_counter()
+    pipeline.check_duplicates(labelled[0][0])
+    cold_ms = (time.perf_counter() - cold_started) * 1000
+    for idea, is_dup in labelled:
+        started = time.perf_counter()
+        predicted, _ = pipeline.check_duplicates(idea)
+        timings.append(time.perf_counter() - started)
+        tp += predicted and is_dup
+        fp += predicted and not is_dup
+        fn += is_dup and not predicted
+    dedupe = latency_stats(timings)
+    dedupe["cold_ms"] = round(cold_ms, 3)
+
+    # keyword_similarity on raw dicts (tokenizes both sides every call)
+    pairs = [(gen.rng.choice(seeded), idea) for idea, _ in labelled]
+    keyword_timings = []
+    for existing, idea in pairs * 10:
+        started = time.perf_counter()
+        pipeline.keyword_similarity(idea, existing)
+        keyword_timings.append(time.perf_counter() - started)
+
+    # save_idea: full path (ID allocation, insert, incremental index update)
+    save_timings = []
+    for _ in range(queries):
+        idea = gen.idea()
+        embedding = pipeline.get_embedding(f"{idea['title']} {idea['summary']}")
+        started = time.perf_counter()
+        pipeline.save_idea(idea, embedding)
+        save_timings.append(time.perf_counter() - started)
+
+    peak_rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin":
+        peak_rss_kb //= 1024  # macOS reports bytes
+
+    return {
+        "size": size,
+        "dup_rate": dup_rate,
+        "queries": queries,
+        "embedding_model": pipeline.embeddings.get_backend().model,
+        "seed": {"seconds": round(seed_seconds, 3), "rows_per_sec": round(size / seed_seconds, 1)},
+        "check_duplicates": dedupe,
+        "keyword_similarity": {
+            "p50_us": round(percentile(keyword_timings, 50) * 1e6, 2),
+            "p95_us": round(percentile(keyword_timings, 95) * 1e6, 2),
+        },
+        "save_idea": latency_stats(save_timings),
+        "precision": round(tp / (tp + fp), 4) if tp + fp else None,
+        "recall": round(tp / (tp + fn), 4) if tp + fn else None,
+        "peak_rss_mb": round(peak_rss_kb / 1024, 1),
+    }
+
+def run(sizes: List[int], dup_rate: float, queries: int, dim: int) -> Dict:
+    """Run each size in a fresh subprocess (own scratch DB, own peak RSS)"""
+    results = []
+    for size in sizes:
+        workdir = tempfile.mkdtemp(prefix=f"ideas-bench-{size}-")
+        env = dict(
+            os.environ,
+            IDEAS_DB_PATH=os.path.join(workdir, "ideas.db"),
+            IDEAS_TASKS_DIR=os.path.join(workdir, "tasks"),
+            EMBEDDING_BACKEND="hash",
+            EMBEDDING_DIM=str(dim),
+        )
+        print(f"⏱️  {size} ideas...", flush=True)
+        proc = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "_run", str(size), str(dup_rate), str(queries)],
+            env=env, capture_output=True, text=True
+        )
+        if proc.returncode != 0:
+            raise RuntimeError(f"Benchmark for {size} ideas failed:\n{proc.stderr}")
+        result = json.loads(proc.stdout.strip().splitlines()[-1])
+        result["embedding_dim"] = dim
+        results.append(result)
+        print(format_result(result), flush=True)
+
+    return {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "results": results,
+    }
+
+def format_result(r: Dict) -> str:
+    """One human-readable block per size"""
+    dedupe, save = r["check_duplicates"], r["save_idea"]
+    return (
+        f"   seed: {r['seed']['rows_per_sec']} rows/s\n"
+        f"   check_duplicates: p50 {dedupe['p50_ms']}ms | p95 {dedupe['p95_ms']}ms | cold {dedupe['cold_ms']}ms\n"
+        f"   save_idea: p50 {save['p50_ms']}ms | p95 {save['p95_ms']}ms | p99 {save['p99_ms']}ms | "
+        f"max {save['max_ms']}ms | {save['per_sec']}/s\n"
+        f"   keyword_similarity: p50 {r['keyword_similarity']['p50_us']}µs\n"
+        f"   precision {r['precision']} | recall {r['recall']} | peak RSS {r['peak_rss_mb']} MB"
+    )
+
+def compare(old_path: str, new_path: str):
+    """Print p50/p95 and precision/recall changes between two result files"""
+    with open(old_path) as f:
+        old = {r["size"]: r for r in json.load(f)["results"]}
+    with open(new_path) as f:
+        new = {r["size"]: r for r in json.load(f)["results"]}
+
+    for size in sorted(set(old) & set(new)):
+        print(f"📊 {size} ideas")
+        for section in ("check_duplicates", "save_idea"):
+            for key in ("p50_ms", "p95_ms", "p99_ms"):
+                if key not in old[size][section] or key not in new[size][section]:
+                    continue
+                before, after = old[size][section][key], new[size][section][key]
+                change = (after - before) / before if before else 0.0
+                print(f"   {section}.{key}: {before} → {after} ({change:+.1%})")
+        for key in ("precision", "recall", "peak_rss_mb"):
+            print(f"   {key}: {old[size][key]} → {new[size][key]}")
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+
+    if args and args[0] == "_run":
+        print(json.dumps(run_size(int(args[1]), float(args[2]), int(args[3]))))
+        sys.exit(0)
+
+    if args and args[0] == "compare":
+        if len(args) < 3:
+            print("Usage: python benchmark.py compare <old.json> <new.json>")
+            sys.exit(1)
+        compare(args[1], args[2])
+        sys.exit(0)
+
+    def option(name: str, default: str) -> str:
+        if name in args:
+            i = args.index(name)
+            value = args[i + 1]
+            del args[i:i + 2]
+            return value
+        return default
+
+    dup_rate = float(option("--dup-rate", "0.2"))
+    queries = int(option("--queries", "100"))
+    dim = int(option("--dim", os.getenv("EMBEDDING_DIM", str(GEMINI_EMBED_DIM))))
+    out = option("--out", os.path.join(RESULTS_DIR, f"dedupe-{datetime.now():%Y%m%d-%H%M%S}.json"))
+    sizes = [int(a) for a in args] or DEFAULT_SIZES
+
+    report = run(sizes, dup_rate, queries, dim)
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"💾 Results: {out}")
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Shared SQLite connection for the content pipeline
+One connection per process (per thread), WAL mode, explicit transactions
+"""
+
+import os
+import time
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+DB_PATH = os.getenv("IDEAS_DB_PATH", os.path.join(os.path.dirname(__file__), "ideas.db"))
+
+# Applied to every new connection
+PRAGMAS = [
+    "journal_mode = WAL",          # readers never block the writer
+    "synchronous = NORMAL",        # safe with WAL, far fewer fsyncs
+    "mmap_size = 268435456",       # 256 MB memory-mapped reads
+    "cache_size = -16000",         # ~16 MB page cache
+    "temp_store = MEMORY",
+    "busy_timeout = 5000",         # wait for a concurrent writer instead of failing
+]
+
+# Log every embedding/generation call to api_calls (manage.py stats)
+LOG_API_CALLS = os.getenv("LOG_API_CALLS", "1") == "1"
+
+_local = threading.local()
+
+def get_connection() -> sqlite3.Connection:
+    """Return this thread's connection, opening it on first use"""
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        # Autocommit mode: transactions are opened explicitly by transaction()
+        conn = sqlite3.connect(DB_PATH, isolation_level=None)
+        for pragma in PRAGMAS:
+            conn.execute(f"PRAGMA {pragma}")
+        _local.conn = conn
+        _local.depth = 0
+    return conn
+
+@contextmanager
+def transaction() -> Iterator[sqlite3.Connection]:
+    """
+    Unit of work: BEGIN IMMEDIATE ... COMMIT, rolled back on error
+    Takes the write lock up front so read-then-write sequences are atomic.
+    Nested calls join the outer transaction.
+    """
+    conn = get_connection()
+    if _local.depth:
+        _local.depth += 1
+        try:
+            yield conn
+        finally:
+            _local.depth -= 1
+        return
+
+    conn.execute("BEGIN IMMEDIATE")
+    _local.depth = 1
+    try:
+        yield conn
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    else:
+        conn.execute("COMMIT")
+    finally:
+        _local.depth = 0
+
+def close_connection():
+    """Close this thread's connection (it is reopened on next use)"""
+    conn = getattr(_local, "conn", None)
+    if conn is not None:
+        conn.close()
+        _local.conn = None
+
+def record_api_call(**columns) -> Optional[int]:
+    """
+    Insert an api_calls row (created_at defaults to now); returns its id
+    Never raises: None when logging is off or the table doesn't exist yet
+    """
+    if not LOG_API_CALLS:
+        return None
+    columns.setdefault("created_at", time.time())
+    try:
+        return get_connection().execute(
+            f"INSERT INTO api_calls ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+            list(columns.values())
+        ).lastrowid
+    except sqlite3.Error:
+        return None
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Embedding backends for the content pipeline
+Gemini (remote), an on-box sentence-transformers model, or a deterministic
+hashed n-gram backend for offline use
+"""
+
+import os
+import re
+import hashlib
+import threading
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+import numpy as np
+
+# Output size of gemini-embedding-001; the local backend matches it by default
+GEMINI_EMBED_DIM = 3072
+
+# Batch embedding: texts per request (API max 100) and requests in flight
+EMBED_BATCH_SIZE = 100
+EMBED_CONCURRENCY = int(os.getenv("EMBED_CONCURRENCY", "4"))
+
+class EmbeddingBackend:
+    """
+    Turns texts into vectors
+    `model` identifies the vector space: cached vectors are keyed by it, so it
+    must change whenever the produced vectors would.
+    """
+
+    model = "base"
+    name = "base"       # backend tag in api_calls
+    cacheable = True    # worth caching (remote or expensive)
+    logs_calls = False  # writes its own api_calls rows (else pipeline logs each embed)
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        """Embed texts, preserving order"""
+        raise NotImplementedError
+
+    def embed_one(self, text: str) -> List[float]:
+        """Embed a single text"""
+        return self.embed([text])[0]
+
+class GeminiBackend(EmbeddingBackend):
+    """Gemini embedding API (embedContent / batchEmbedContents)"""
+
+    model = "gemini-embedding-001"
+    name = "gemini"
+    logs_calls = True  # gemini_client.post logs every HTTP request
+
+    def __init__(self, api_key: str):
+        import gemini_client  # pulls in requests; only loaded once Gemini is in use
+        self.client = gemini_client
+        self.api_key = api_key
+        self.url = f"{gemini_client.API_BASE}/models/{self.model}:embedContent"
+        self.batch_url = f"{gemini_client.API_BASE}/models/{self.model}:batchEmbedContents"
+
+    def embed_one(self, text: str) -> List[float]:
+        data = {
+            "content": {"parts": [{"text": text}]}
+        }
+
+        response = self.client.post(f"{self.url}?key={self.api_key}", data, kind="embed")
+
+        if response.status_code != 200:
+            raise Exception(f"Gemini API error: {response.text}")
+
+        return response.json()["embedding"]["values"]
+
+    def _embed_batch(self, texts: List[str]) -> List[List[float]]:
+        """One batchEmbedContents call for up to EMBED_BATCH_SIZE texts"""
+        data = {
+            "requests": [
+                {
+                    "model": f"models/{self.model}",
+                    "content": {"parts": [{"text": text}]}
+                }
+                for text in texts
+            ]
+        }
+
+        response = self.client.post(f"{self.batch_url}?key={self.api_key}", data, kind="embed")
+
+        if response.status_code != 200:
+            raise Exception(f"Gemini API error: {response.text}")
+
+        return [e["values"] for e in response.json()["embeddings"]]
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        """Chunks of EMBED_BATCH_SIZE, at most EMBED_CONCURRENCY requests in flight"""
+        chunks = [texts[i:i + EMBED_BATCH_SIZE] for i in range(0, len(texts), EMBED_BATCH_SIZE)]
+        with ThreadPoolExecutor(max_workers=max(EMBED_CONCURRENCY, 1)) as pool:
+            return [vector for batch in pool.map(self._embed_batch, chunks) for vector in batch]
+
+@lru_cache(maxsize=1 << 16)
+def _feature_slot(feature: str, dim: int) -> Tuple[int, float]:
+    """Stable (index, sign) for a feature; blake2b, unlike hash(), is not salted"""
+    h = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "little")
+    return h % dim, (1.0 if h >> 63 else -1.0)
+
+class HashingBackend(EmbeddingBackend):
+    """
+    Deterministic local embeddings: signed feature hashing of word unigrams
+    and character trigrams, L2-normalized
+    Same text gives the same vector in every process; texts sharing words or
+    word fragments get correspondingly similar vectors. No network needed.
+    """
+
+    name = "hash"
+    cacheable = False  # cheaper to recompute than to look up
+
+    def __init__(self, dim: int = GEMINI_EMBED_DIM):
+        self.dim = dim
+        self.model = f"hash-ngram-{dim}"
+
+    def _features(self, text: str) -> List[str]:
+        words = re.findall(r"\w+", text.lower())
+        features = [f"w:{word}" for word in words]
+        for word in words:
+            padded = f" {word} "
+            features.extend(f"c:{padded[i:i + 3]}" for i in range(len(padded) - 2))
+        return features
+
+    def vector(self, text: str) -> np.ndarray:
+        """Embedding as a float32 array"""
+        vec = np.zeros(self.dim, dtype=np.float32)
+        slots = [_feature_slot(f, self.dim) for f in self._features(text)]
+        if slots:
+            index, sign = zip(*slots)
+            np.add.at(vec, list(index), list(sign))
+        norm = np.linalg.norm(vec)
+        return vec / norm if norm else vec
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        return [self.vector(text).tolist() for text in texts]
+
+class SentenceTransformerBackend(EmbeddingBackend):
+    """
+    On-box CPU embeddings via sentence-transformers (optional dependency)
+    The model is loaded lazily on first use; `threads` caps torch's CPU threads.
+    """
+
+    name = "local"
+
+    def __init__(self, model_name: str, threads: int = 0, batch_size: int = 32):
+        self.model_name = model_name
+        self.model = f"local:{model_name}"
+        self.threads = threads
+        self.batch_size = batch_size
+        self._encoder = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        with self._lock:
+            if self._encoder is None:
+                try:
+                    import torch
+                    from sentence_transformers import SentenceTransformer
+                except ImportError as e:
+                    raise ImportError(
+                        "EMBEDDING_BACKEND=local needs sentence-transformers: "
+                        "pip install sentence-transformers"
+                    ) from e
+                if self.threads:
+                    torch.set_num_threads(self.threads)
+                self._encoder = SentenceTransformer(self.model_name, device="cpu")
+        return self._encoder
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        encoder = self._load()
+        vectors = encoder.encode(
+            texts,
+            batch_size=self.batch_size,
+            normalize_embeddings=True,
+            convert_to_numpy=True,
+            show_progress_bar=False,
+        )
+        return vectors.tolist()
+
+# name -> factory; register_backend() adds more
+BACKENDS: Dict[str, Callable[[], EmbeddingBackend]] = {
+    "gemini": lambda: GeminiBackend(os.getenv("GEMINI_API_KEY", "")),
+    "hash": lambda: HashingBackend(int(os.getenv("EMBEDDING_DIM", str(GEMINI_EMBED_DIM)))),
+    "local": lambda: SentenceTransformerBackend(
+        os.getenv("LOCAL_EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2"),
+        threads=int(os.getenv("EMBEDDING_THREADS", "0")),
+        batch_size=int(os.getenv("LOCAL_EMBED_BATCH_SIZE", "32")),
+    ),
+}
+
+_backend: Optional[EmbeddingBackend] = None
+
+def register_backend(name: str, factory: Callable[[], EmbeddingBackend]):
+    """Make a backend selectable via EMBEDDING_BACKEND=<name>"""
+    BACKENDS[name] = factory
+
+def get_backend() -> EmbeddingBackend:
+    """
+    Active backend, chosen once per process from EMBEDDING_BACKEND
+    Defaults to Gemini when GEMINI_API_KEY is set, else the hashing backend
+    """
+    global _backend
+    if _backend is None:
+        name = os.getenv("EMBEDDING_BACKEND", "")
+        if not name:
+            name = "gemini" if os.getenv("GEMINI_API_KEY") else "hash"
+            if name == "hash":
+                print("⚠️  GEMINI_API_KEY not set. Using local hashed embeddings.")
+        if name not in BACKENDS:
+            raise ValueError(f"Unknown EMBEDDING_BACKEND: {name} (choose from {', '.join(BACKENDS)})")
+        _backend = BACKENDS[name]()
+    return _backend
+
+def set_backend(backend: Optional[EmbeddingBackend]):
+    """Override the active backend (None re-reads the environment)"""
+    global _backend
+    _backend = backend
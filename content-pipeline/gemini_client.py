@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Shared HTTP client for Gemini API calls
+Keep-alive session, timeouts, retries with backoff, client-side rate limiting,
+and a row in the api_calls table for every call
+"""
+
+import os
+import time
+import random
+import sqlite3
+import threading
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+import requests
+from requests.adapters import HTTPAdapter
+import db
+
+# API root; override to point at a local mock server
+API_BASE = os.getenv("GEMINI_API_BASE", "https://generativelanguage.googleapis.com/v1beta")
+
+# (connect, read) timeouts in seconds; generation can take a while
+CONNECT_TIMEOUT = float(os.getenv("GEMINI_CONNECT_TIMEOUT", "5"))
+READ_TIMEOUT = float(os.getenv("GEMINI_READ_TIMEOUT", "120"))
+
+# Retry 429s and server errors with exponential backoff (+ jitter)
+MAX_RETRIES = int(os.getenv("GEMINI_MAX_RETRIES", "5"))
+BACKOFF_BASE = 1.0
+BACKOFF_MAX = 60.0
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Requests per minute, sized to the free tier
+RATE_LIMITS = {
+    "embed": int(os.getenv("GEMINI_EMBED_RPM", "100")),
+    "generate": int(os.getenv("GEMINI_GENERATE_RPM", "15")),
+}
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate_per_minute` tokens, refilled continuously"""
+
+    def __init__(self, rate_per_minute: int):
+        self.capacity = max(rate_per_minute, 1)
+        self.tokens = float(self.capacity)
+        self.refill_per_sec = self.capacity / 60.0
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a token is available, then take it"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.refill_per_sec)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.refill_per_sec
+            time.sleep(wait)
+
+_buckets: Dict[str, TokenBucket] = {kind: TokenBucket(rpm) for kind, rpm in RATE_LIMITS.items()}
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+def get_session() -> requests.Session:
+    """Process-wide keep-alive session (connection pool reused across calls)"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16)
+            _session.mount("https://", adapter)
+            _session.mount("http://", adapter)
+            _session.headers.update({"Content-Type": "application/json"})
+        return _session
+
+def _retry_after(response: requests.Response) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date)"""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+def _backoff(attempt: int) -> float:
+    """Exponential backoff with full jitter"""
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * (2 ** attempt)))
+
+def _record_call(kind: str, url: str, response: Optional[requests.Response], retries: int,
+                 latency: float, total: float, error: str = None, stream: bool = False) -> Optional[int]:
+    """Insert an api_calls row; returns its id (None when logging is off or impossible)"""
+    usage = {}
+    if response is not None and not stream and kind == "generate" and response.status_code == 200:
+        try:
+            usage = response.json().get("usageMetadata", {})
+        except ValueError:
+            pass
+    
+    if error is None and response is not None and response.status_code != 200 and not stream:
+        error = response.text[:500]
+    
+    return db.record_api_call(
+        kind=kind,
+        backend="gemini",
+        endpoint=urlsplit(url).path.rsplit("/", 1)[-1],  # e.g. gemini-2.0-flash:generateContent (no key)
+        status=response.status_code if response is not None else None,
+        retries=retries,
+        latency_ms=round(latency * 1000, 1),
+        total_ms=round(total * 1000, 1),
+        prompt_tokens=usage.get("promptTokenCount"),
+        output_tokens=usage.get("candidatesTokenCount"),
+        total_tokens=usage.get("totalTokenCount"),
+        error=error,
+    )
+
+def record_usage(response: requests.Response, usage: Dict):
+    """Complete a streamed call's api_calls row: token counts and total time once the stream ends"""
+    call_id = getattr(response, "api_call_id", None)
+    if call_id is None:
+        return
+    try:
+        with db.transaction() as conn:
+            conn.execute("""
+                UPDATE api_calls
+                SET prompt_tokens = ?, output_tokens = ?, total_tokens = ?, total_ms = ?
+                WHERE id = ?
+            """, (
+                usage.get("promptTokenCount"),
+                usage.get("candidatesTokenCount"),
+                usage.get("totalTokenCount"),
+                round((time.perf_counter() - response.api_call_started) * 1000, 1),
+                call_id,
+            ))
+    except sqlite3.Error:
+        pass
+
+def post(url: str, payload: Dict, kind: str = "generate", stream: bool = False) -> requests.Response:
+    """
+    POST JSON to Gemini with rate limiting and retries
+    Retries connection errors, timeouts, 429 and 5xx (honoring Retry-After);
+    returns the last response (callers check status_code) or raises the last
+    connection error
+    With stream=True the body is left unread for iter_lines(); only failures
+    before the response starts are retried
+    Every call is logged to api_calls: latency of the final attempt, total
+    time including retries and rate-limit waits, and (non-streamed generate)
+    token usage; streamed calls are completed by record_usage()
+    """
+    session = get_session()
+    bucket = _buckets[kind]
+    started = time.perf_counter()
+
+    for attempt in range(MAX_RETRIES + 1):
+        bucket.acquire()
+        sent = time.perf_counter()
+        try:
+            response = session.post(url, json=payload, timeout=(CONNECT_TIMEOUT, READ_TIMEOUT), stream=stream)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            if attempt == MAX_RETRIES:
+                now = time.perf_counter()
+                _record_call(kind, url, None, attempt, now - sent, now - started,
+                             error=f"{type(e).__name__}: {e}"[:500], stream=stream)
+                raise
+            delay = _backoff(attempt)
+        else:
+            if response.status_code not in RETRY_STATUSES or attempt == MAX_RETRIES:
+                now = time.perf_counter()
+                response.api_call_started = started
+                response.api_call_id = _record_call(kind, url, response, attempt, now - sent, now - started, stream=stream)
+                return response
+            delay = _retry_after(response)
+            response.close()
+            if delay is None:
+                delay = _backoff(attempt)
+            delay = min(delay, BACKOFF_MAX)
+
+        print(f"⏳ Gemini retry {attempt + 1}/{MAX_RETRIES} in {delay:.1f}s")
+        time.sleep(delay)
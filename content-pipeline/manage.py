@@ -3,55 +3,75 @@
 Manage content ideas - list, approve, reject, view
 """
 
-import sqlite3
 import json
-import os
+import sqlite3
 from datetime import datetime
-from script_generator import approve_and_generate
+import db
+
+DB_PATH = db.DB_PATH
 
-DB_PATH = os.path.join(os.path.dirname(__file__), "ideas.db")
+# Columns for list views and for export (everything but the embedding)
+LIST_COLUMNS = ["id", "date", "type", "title", "status", "tags"]
+EXPORT_COLUMNS = ["id", "date", "type", "title", "slug", "summary", "tags", "status", "response", "created_at"]
 
-def list_ideas(status=None, limit=10):
-    """List content ideas"""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
+def iter_ideas(status=None, limit=None, after=None, idea_type=None, tag=None,
+               since=None, until=None, columns=LIST_COLUMNS):
+    """
+    Stream ideas newest first (date DESC, id DESC) as dicts
+    Keyset pagination: `after` is the last id of the previous page, so deep
+    pages cost the same as the first one (served by the (status, date, id)
+    and (date, id) indexes). Filters: type, a single tag, date range (inclusive).
+    """
+    where, params = [], []
     
     if status:
-        query = """
-            SELECT id, date, type, title, status, tags
-            FROM content_ideas
-            WHERE status = ?
-            ORDER BY date DESC, id DESC
-            LIMIT ?
-        """
-        cursor.execute(query, (status, limit))
-    else:
-        query = """
-            SELECT id, date, type, title, status, tags
-            FROM content_ideas
-            ORDER BY date DESC, id DESC
-            LIMIT ?
-        """
-        cursor.execute(query, (limit,))
-    
-    ideas = []
-    for row in cursor.fetchall():
-        ideas.append({
-            "id": row[0],
-            "date": row[1],
-            "type": row[2],
-            "title": row[3],
-            "status": row[4],
-            "tags": row[5]
-        })
+        where.append("status = ?")
+        params.append(status)
+    if idea_type:
+        where.append("type = ?")
+        params.append(idea_type)
+    if tag:
+        # Whole-tag match within the comma-separated list (instr: exact case, no wildcards)
+        where.append("instr(',' || REPLACE(tags, ' ', '') || ',', ?) > 0")
+        params.append(f",{tag.replace(' ', '')},")
+    if since:
+        where.append("date >= ?")
+        params.append(since)
+    if until:
+        where.append("date <= ?")
+        params.append(until)
+    if after:
+        # Row-value comparison against the cursor row (ids start with their date)
+        where.append("(date, id) < (COALESCE((SELECT date FROM content_ideas WHERE id = ?), substr(?, 1, 10)), ?)")
+        params.extend([after, after, after])
     
-    conn.close()
-    return ideas
+    query = f"SELECT {', '.join(columns)} FROM content_ideas"
+    if where:
+        query += " WHERE " + " AND ".join(where)
+    query += " ORDER BY date DESC, id DESC"
+    if limit:
+        query += " LIMIT ?"
+        params.append(limit)
+    
+    # Iterating the cursor fetches rows as needed instead of all at once
+    for row in db.get_connection().execute(query, params):
+        yield dict(zip(columns, row))
+
+def list_ideas(status=None, limit=10, after=None, idea_type=None, tag=None, since=None, until=None):
+    """List content ideas (one page; pass the last id as `after` for the next)"""
+    return list(iter_ideas(status, limit, after, idea_type, tag, since, until))
+
+def export_ideas(out, **filters) -> int:
+    """Write matching ideas to `out` as JSON lines without loading them all; returns the count"""
+    count = 0
+    for idea in iter_ideas(columns=EXPORT_COLUMNS, **filters):
+        out.write(json.dumps(idea) + "\n")
+        count += 1
+    return count
 
 def get_idea(idea_id):
     """Get full details of an idea"""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
+    cursor = db.get_connection().cursor()
     
     cursor.execute("""
         SELECT id, date, type, title, slug, summary, tags, status, response, created_at
@@ -60,7 +80,6 @@ def get_idea(idea_id):
     """, (idea_id,))
     
     result = cursor.fetchone()
-    conn.close()
     
     if not result:
         return None
@@ -88,29 +107,27 @@ def update_status(idea_id, new_status, response=None):
             "error": f"Invalid status. Must be one of: {', '.join(valid_statuses)}"
         }
     
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
+    with db.transaction() as conn:
+        cursor = conn.cursor()
+        
+        if response:
+            cursor.execute("""
+                UPDATE content_ideas
+                SET status = ?, response = ?
+                WHERE id = ?
+            """, (new_status, response, idea_id))
+        else:
+            cursor.execute("""
+                UPDATE content_ideas
+                SET status = ?
+                WHERE id = ?
+            """, (new_status, idea_id))
+        
+        updated = cursor.rowcount
     
-    if response:
-        cursor.execute("""
-            UPDATE content_ideas
-            SET status = ?, response = ?
-            WHERE id = ?
-        """, (new_status, response, idea_id))
-    else:
-        cursor.execute("""
-            UPDATE content_ideas
-            SET status = ?
-            WHERE id = ?
-        """, (new_status, idea_id))
-    
-    if cursor.rowcount == 0:
-        conn.close()
+    if updated == 0:
         return {"success": False, "error": f"Idea {idea_id} not found"}
     
-    conn.commit()
-    conn.close()
-    
     return {
         "success": True,
         "idea_id": idea_id,
@@ -120,7 +137,9 @@ def update_status(idea_id, new_status, response=None):
 def approve_idea(idea_id, generate_script=True):
     """Approve idea and optionally generate script"""
     if generate_script:
-        # Use script_generator to approve + generate
+        # Use script_generator to approve + generate (imported here: it pulls in
+        # requests and dotenv, which list/view/reject don't need)
+        from script_generator import approve_and_generate
         return approve_and_generate(idea_id)
     else:
         # Just update status
@@ -130,6 +149,89 @@ def reject_idea(idea_id, reason=None):
     """Reject idea with optional reason"""
     return update_status(idea_id, "rejected", response=reason)
 
+def _percentile(values, pct):
+    """Nearest-rank percentile of a sorted list"""
+    if not values:
+        return None
+    return values[min(int(len(values) * pct / 100), len(values) - 1)]
+
+def api_stats(days=None):
+    """
+    Summarize the api_calls log (optionally the last `days` days)
+    Covers Gemini HTTP calls, local embedding backends and embedding cache hits
+    (backend "cache"); `items` counts texts for local/cache embedding calls
+    Returns: {by_endpoint: [{kind, backend, endpoint, calls, items, errors, retries, p50_ms, p95_ms}],
+              by_day: [{day, kind, backend, calls, items, prompt_tokens, output_tokens, total_tokens}]}
+    """
+    conn = db.get_connection()
+    since = (datetime.now().timestamp() - days * 86400) if days else 0
+    
+    by_endpoint = []
+    groups = conn.execute("""
+        SELECT kind, COALESCE(backend, 'gemini') AS backend, endpoint, COUNT(*), SUM(items),
+               SUM(error IS NOT NULL OR COALESCE(status, 0) >= 400), SUM(retries)
+        FROM api_calls
+        WHERE created_at >= ?
+        GROUP BY kind, backend, endpoint
+        ORDER BY kind, backend, endpoint
+    """, (since,)).fetchall()
+    for kind, backend, endpoint, calls, items, errors, retries in groups:
+        latencies = [row[0] for row in conn.execute("""
+            SELECT latency_ms FROM api_calls
+            WHERE kind = ? AND COALESCE(backend, 'gemini') = ? AND endpoint = ? AND created_at >= ?
+            ORDER BY latency_ms
+        """, (kind, backend, endpoint, since))]
+        by_endpoint.append({
+            "kind": kind,
+            "backend": backend,
+            "endpoint": endpoint,
+            "calls": calls,
+            "items": items,
+            "errors": errors,
+            "retries": retries,
+            "p50_ms": _percentile(latencies, 50),
+            "p95_ms": _percentile(latencies, 95),
+        })
+    
+    by_day = [
+        dict(zip(["day", "kind", "backend", "calls", "items", "prompt_tokens", "output_tokens", "total_tokens"], row))
+        for row in conn.execute("""
+            SELECT date(created_at, 'unixepoch', 'localtime') AS day, kind,
+                   COALESCE(backend, 'gemini') AS backend, COUNT(*), SUM(items),
+                   COALESCE(SUM(prompt_tokens), 0), COALESCE(SUM(output_tokens), 0),
+                   COALESCE(SUM(total_tokens), 0)
+            FROM api_calls
+            WHERE created_at >= ?
+            GROUP BY day, kind, backend
+            ORDER BY day DESC, kind, backend
+        """, (since,))
+    ]
+    
+    return {"by_endpoint": by_endpoint, "by_day": by_day}
+
+def format_api_stats(stats):
+    """Format api_stats for display"""
+    if not stats["by_endpoint"]:
+        return "No API calls recorded"
+    
+    output = ["📡 Latency by endpoint (backend 'cache' = served from the embedding cache)"]
+    for e in stats["by_endpoint"]:
+        items = f" ({e['items']} texts)" if e["items"] else ""
+        output.append(
+            f"  {e['kind']:<8} {e['backend']:<6} {e['endpoint']}: {e['calls']} calls{items} | "
+            f"p50 {e['p50_ms']} ms | p95 {e['p95_ms']} ms | {e['errors']} errors | {e['retries']} retries"
+        )
+    
+    output.append("\n🪙 Calls and tokens per day")
+    for d in stats["by_day"]:
+        items = f" ({d['items']} texts)" if d["items"] else ""
+        output.append(
+            f"  {d['day']} {d['kind']:<8} {d['backend']:<6} {d['calls']} calls{items} | "
+            f"prompt {d['prompt_tokens']} | output {d['output_tokens']} | total {d['total_tokens']}"
+        )
+    
+    return "\n".join(output)
+
 def format_idea_list(ideas):
     """Format ideas for display"""
     if not ideas:
@@ -159,20 +261,47 @@ if __name__ == "__main__":
     
     if len(sys.argv) < 2:
         print("Usage:")
-        print("  python manage.py list [status] [limit]")
+        print("  python manage.py list [status|all] [limit] [--after id] [--type t] [--tag t]")
+        print("                         [--since YYYY-MM-DD] [--until YYYY-MM-DD] [--jsonl]")
+        print("  python manage.py export [status|all] [--type t] [--tag t] [--since d] [--until d] > ideas.jsonl")
         print("  python manage.py view <idea_id>")
         print("  python manage.py approve <idea_id>")
         print("  python manage.py reject <idea_id> [reason]")
         print("  python manage.py status <idea_id> <new_status>")
+        print("  python manage.py stats [days] [--json]   # Gemini call latency and tokens per day")
         sys.exit(1)
     
     command = sys.argv[1]
     
-    if command == "list":
-        status = sys.argv[2] if len(sys.argv) > 2 else None
-        limit = int(sys.argv[3]) if len(sys.argv) > 3 else 10
-        ideas = list_ideas(status, limit)
-        print(format_idea_list(ideas))
+    if command in ("list", "export"):
+        # Positional [status] [limit] plus --after/--type/--tag/--since/--until/--jsonl
+        args, filters = [], {}
+        rest = sys.argv[2:]
+        while rest:
+            arg = rest.pop(0)
+            if arg == "--jsonl":
+                filters["jsonl"] = True
+            elif arg in ("--after", "--type", "--tag", "--since", "--until") and rest:
+                key = "idea_type" if arg == "--type" else arg[2:]
+                filters[key] = rest.pop(0)
+            else:
+                args.append(arg)
+        jsonl = filters.pop("jsonl", False)
+        status = args[0] if args and args[0] != "all" else None
+        
+        if command == "export":
+            count = export_ideas(sys.stdout, status=status, **filters)
+            print(f"📤 Exported {count} idea(s)", file=sys.stderr)
+        else:
+            limit = int(args[1]) if len(args) > 1 else 10
+            ideas = list_ideas(status, limit, **filters)
+            if jsonl:
+                for idea in ideas:
+                    print(json.dumps(idea))
+            else:
+                print(format_idea_list(ideas))
+            if len(ideas) == limit:
+                print(f"\n➡️  Next page: --after {ideas[-1]['id']}", file=sys.stderr)
     
     elif command == "view":
         if len(sys.argv) < 3:
@@ -206,6 +335,21 @@ if __name__ == "__main__":
         result = update_status(sys.argv[2], sys.argv[3])
         print(json.dumps(result, indent=2))
     
+    elif command == "stats":
+        args = [a for a in sys.argv[2:] if a != "--json"]
+        try:
+            stats = api_stats(int(args[0]) if args else None)
+        except sqlite3.OperationalError as e:
+            # Database predates the api_calls migrations
+            if not str(e).startswith(("no such table", "no such column")):
+                raise
+            print(f"Error: {e}; run `python pipeline.py init` to migrate the database")
+            sys.exit(1)
+        if "--json" in sys.argv:
+            print(json.dumps(stats, indent=2))
+        else:
+            print(format_api_stats(stats))
+    
     else:
         print(f"Unknown command: {command}")
         sys.exit(1)
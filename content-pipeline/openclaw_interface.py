@@ -7,10 +7,13 @@ Call this with research data from OpenClaw tools
 import sys
 import json
 import os
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from typing import Dict, List
 from pipeline import (
     init_db, check_duplicates, save_idea, create_task,
-    get_embedding, generate_slug
+    get_embedding, get_embeddings, generate_slug, start_reembed_process, format_research_results
 )
 
 def process_with_research(
@@ -77,35 +80,7 @@ def process_with_research(
     print("💾 Saving to database...")
     idea_id = save_idea(idea, embedding)
     
-    # Format research
-    research = {}
-    
-    if twitter_results:
-        twitter_md = "\n".join([
-            f"- [{r.get('title', 'Tweet')}]({r.get('url', '#')})"
-            for r in twitter_results[:5]
-        ])
-        research['twitter'] = twitter_md
-    else:
-        research['twitter'] = "No Twitter results"
-    
-    if kb_results:
-        kb_md = "\n".join([
-            f"- {r.get('path', 'Unknown')} (score: {r.get('score', 0):.2f})"
-            for r in kb_results[:3]
-        ])
-        research['kb'] = kb_md
-    else:
-        research['kb'] = "No related content in KB"
-    
-    if web_results:
-        web_md = "\n".join([
-            f"- [{r.get('title', 'Source')}]({r.get('url', '#')})"
-            for r in web_results[:5]
-        ])
-        research['web'] = web_md
-    else:
-        research['web'] = "No web results"
+    research = format_research_results(twitter_results, kb_results, web_results)
     
     # Create task file
     print("📝 Creating task file...")
@@ -122,9 +97,112 @@ def process_with_research(
         "task_file": task_file
     }
 
+def _ingest_one(item: Dict, embedding: List[float]) -> Dict:
+    """Dedupe, save and write the task file for one embedded idea (writer side)"""
+    idea = {
+        "title": item["title"],
+        "summary": item.get("summary") or item["title"],
+        "type": item.get("type", "short"),
+        "tags": item.get("tags", "")
+    }
+    
+    # Earlier ideas of the batch are already saved, so they're candidates too
+    is_duplicate, similar = check_duplicates(idea, embedding)
+    if is_duplicate:
+        return {
+            "success": False,
+            "duplicate": True,
+            "matches": similar
+        }
+    
+    idea_id = save_idea(idea, embedding)
+    research = format_research_results(item.get("twitter"), item.get("kb"), item.get("web"))
+    task_file = create_task(idea, idea_id, research)
+    
+    return {
+        "success": True,
+        "duplicate": False,
+        "idea_id": idea_id,
+        "slug": generate_slug(idea["title"]),
+        "task_file": task_file
+    }
+
+async def process_batch_async(items: List[Dict]) -> List[Dict]:
+    """
+    Ingest many ideas at once
+    Each item: {"title", "summary"?, "tags"?, "type"?, "twitter"?, "kb"?, "web"?}
+    A single writer thread owns every DB access: it embeds the whole batch in
+    one get_embeddings call (cache lookups and stores on its connection,
+    Gemini requests batched with EMBED_CONCURRENCY in flight), then dedupes
+    and saves ideas in input order, so near-duplicates within the batch are
+    caught against each other.
+    Returns one result per item, in input order (same shape as
+    process_with_research, or {"success": False, "error"} on failure)
+    """
+    loop = asyncio.get_running_loop()
+    results = [None] * len(items)
+    
+    def report(i: int, result: Dict):
+        results[i] = result
+        if result["success"]:
+            print(f"✅ {result['idea_id']} {items[i]['title']}")
+        elif result["duplicate"]:
+            print(f"❌ {items[i]['title']} → {result['matches'][0]['title']}")
+        else:
+            print(f"⚠️  {items[i].get('title')}: {result['error']}")
+    
+    # One thread owns every DB write (and its thread-local connection)
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="ideas-writer") as writer:
+        await loop.run_in_executor(writer, init_db)
+        
+        texts, pending = [], []
+        for i, item in enumerate(items):
+            if not item.get("title"):
+                report(i, {"success": False, "duplicate": False, "error": "missing title"})
+                continue
+            texts.append(f"{item['title']} {item.get('summary') or item['title']}")
+            pending.append(i)
+        
+        try:
+            vectors = await loop.run_in_executor(writer, get_embeddings, texts) if texts else []
+        except Exception as e:
+            vectors = []
+            for i in pending:
+                report(i, {"success": False, "duplicate": False, "error": str(e)})
+        
+        for i, embedding in zip(pending, vectors):
+            try:
+                result = await loop.run_in_executor(writer, _ingest_one, items[i], embedding)
+            except Exception as e:
+                result = {"success": False, "duplicate": False, "error": str(e)}
+            report(i, result)
+    
+    return results
+
+def process_batch(items: List[Dict]) -> List[Dict]:
+    """Blocking wrapper around process_batch_async"""
+    return asyncio.run(process_batch_async(items))
+
 if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--batch":
+        if len(sys.argv) < 3:
+            print("Usage: python openclaw_interface.py --batch <ideas.jsonl>")
+            sys.exit(1)
+        
+        with open(sys.argv[2]) as f:
+            items = [json.loads(line) for line in f if line.strip()]
+        
+        results = process_batch(items)
+        saved = sum(1 for r in results if r["success"])
+        print(f"\n💾 Saved {saved}/{len(results)} idea(s)")
+        print(json.dumps(results, indent=2))
+        if start_reembed_process():
+            print("🧠 Re-embedding other-model ideas in the background")
+        sys.exit(0)
+    
     if len(sys.argv) < 3:
         print("Usage: python openclaw_interface.py 'title' 'summary' [tags] [type] [research_json]")
+        print("       python openclaw_interface.py --batch <ideas.jsonl>")
         sys.exit(1)
     
     title = sys.argv[1]
@@ -151,4 +229,7 @@ if __name__ == "__main__":
     )
     
     print("\n" + "="*60)
-    print(json.dumps(result, indent=2))
+    print(json.dumps(result, indent=2), flush=True)
+    
+    # A background thread would die with this process: migrate in a detached one
+    start_reembed_process()
@@ -8,56 +8,397 @@ import sqlite3
 import json
 import re
 import os
-from datetime import datetime
-from typing import List, Dict, Tuple
-import requests
+import sys
+import hashlib
+import subprocess
+import threading
+import time
+import unicodedata
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import List, Dict, Optional, Tuple
 import numpy as np
 from dotenv import load_dotenv
+import db
+from schema_version import SCHEMA_VERSION
+import embeddings
+from vector_index import VectorIndex, append_delta, index_path_for, normalize
 
 # Load .env file
 load_dotenv(os.path.join(os.path.dirname(__file__), ".env"))
 
-DB_PATH = os.path.join(os.path.dirname(__file__), "ideas.db")
-TASKS_DIR = os.path.join(os.path.dirname(__file__), "tasks")
+DB_PATH = db.DB_PATH
+TASKS_DIR = os.getenv("IDEAS_TASKS_DIR", os.path.join(os.path.dirname(__file__), "tasks"))
+INDEX_PATH = index_path_for(DB_PATH)
 
-# Gemini API (free tier)
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY", "")
-GEMINI_EMBED_URL = "https://generativelanguage.googleapis.com/v1beta/models/gemini-embedding-001:embedContent"
+# Embedding cache: in-memory LRU in front of the embedding_cache table
+EMBEDDING_CACHE_SIZE = 1024
 
 # Similarity threshold
-DUPLICATE_THRESHOLD = 0.40  # 40% combined similarity
+DUPLICATE_THRESHOLD = float(os.getenv("DUPLICATE_THRESHOLD", "0.40"))  # 40% combined similarity
+
+# Rows appended to the index delta file before it is folded into the index file
+INDEX_DELTA_MAX = int(os.getenv("INDEX_DELTA_MAX", "1024"))
+
+# A re-embed run holds the worker_checkpoints row; it expires if not renewed this long
+REEMBED_LEASE_SECONDS = int(os.getenv("REEMBED_LEASE_SECONDS", "300"))
+
+# Nearest neighbours pulled from the vector index for keyword re-scoring
+DEDUPE_TOP_K = 50
+
+# Best BM25 matches pulled from the full-text index (unioned with the above)
+KEYWORD_TOP_K = 50
+
+# content_ideas.embedding_format values
+EMBEDDING_FORMAT_JSON = 0  # legacy: json.dumps(list) text
+EMBEDDING_FORMAT_F32 = 1   # packed little-endian float32
+
+SCHEMA_PATH = os.path.join(os.path.dirname(__file__), "schema.sql")
+
+def _schema_statements() -> List[str]:
+    """schema.sql split into single statements (trigger bodies kept whole)"""
+    with open(SCHEMA_PATH) as f:
+        lines = f.read().splitlines(keepends=True)
+    
+    statements, current = [], ""
+    for line in lines:
+        current += line
+        if sqlite3.complete_statement(current):
+            statements.append(current.strip())
+            current = ""
+    return statements
+
+def _create_schema(conn: sqlite3.Connection):
+    """Run schema.sql statement by statement (executescript would commit the open transaction)"""
+    for statement in _schema_statements():
+        conn.execute(statement)
+
+# Columns added to content_ideas before schema versioning: (name, definition)
+ADDED_COLUMNS = [
+    ("embedding_format", "INTEGER DEFAULT 0"),
+    ("title_tokens", "TEXT"),
+    ("summary_tokens", "TEXT"),
+    ("tag_tokens", "TEXT"),
+    ("embedding_model", "TEXT"),
+]
+
+def _migrate_unversioned(conn: sqlite3.Connection):
+    """1: upgrade a database created before PRAGMA user_version (any earlier layout)"""
+    fts_existed = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE name = 'content_ideas_fts'"
+    ).fetchone()
+    
+    # CREATE TABLE IF NOT EXISTS leaves older databases without new columns
+    existing = {row[1] for row in conn.execute("PRAGMA table_info(content_ideas)")}
+    for name, definition in ADDED_COLUMNS:
+        if name not in existing:
+            conn.execute(f"ALTER TABLE content_ideas ADD COLUMN {name} {definition}")
+    
+    _create_schema(conn)
+    
+    if "title_tokens" not in existing:
+        backfill_keyword_features(conn)
+    
+    if "embedding_model" not in existing:
+        backfill_embedding_models(conn)
+    
+    # Triggers only cover new writes; index rows saved before the FTS table
+    if not fts_existed:
+        conn.execute("""
+            INSERT INTO content_ideas_fts (id, title, summary, tags)
+            SELECT id, title, summary, tags FROM content_ideas
+        """)
+
+def _migrate_listing_indexes(conn: sqlite3.Connection):
+    """2: composite indexes for keyset-paginated listing (replace the single-column ones)"""
+    conn.execute("DROP INDEX IF EXISTS idx_status")
+    conn.execute("DROP INDEX IF EXISTS idx_date")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_status_date_id ON content_ideas(status, date, id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_date_id ON content_ideas(date, id)")
+
+def _migrate_generation_jobs(conn: sqlite3.Connection):
+    """3: generation_jobs queue for script_generator.py"""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS generation_jobs (
+          id INTEGER PRIMARY KEY,
+          idea_id TEXT NOT NULL,
+          status TEXT NOT NULL DEFAULT 'queued',
+          attempts INTEGER NOT NULL DEFAULT 0,
+          last_error TEXT,
+          queued_at REAL NOT NULL,
+          next_attempt_at REAL NOT NULL,
+          started_at REAL,
+          finished_at REAL,
+          script_file TEXT
+        )
+    """)
+    conn.execute("""
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_generation_jobs_active
+          ON generation_jobs(idea_id) WHERE status IN ('queued', 'running')
+    """)
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_generation_jobs_status
+          ON generation_jobs(status, next_attempt_at)
+    """)
+
+def _migrate_llm_cache(conn: sqlite3.Connection):
+    """4: llm_cache response cache for script_generator.py"""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS llm_cache (
+          key TEXT PRIMARY KEY,
+          model TEXT NOT NULL,
+          response TEXT NOT NULL,
+          size INTEGER NOT NULL,
+          created_at REAL NOT NULL,
+          last_used_at REAL NOT NULL,
+          hits INTEGER NOT NULL DEFAULT 0
+        )
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_last_used ON llm_cache(last_used_at)")
+
+def _migrate_api_calls(conn: sqlite3.Connection):
+    """5: api_calls log written by gemini_client"""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS api_calls (
+          id INTEGER PRIMARY KEY,
+          created_at REAL NOT NULL,
+          kind TEXT NOT NULL,
+          endpoint TEXT NOT NULL,
+          status INTEGER,
+          retries INTEGER NOT NULL,
+          latency_ms REAL NOT NULL,
+          total_ms REAL NOT NULL,
+          prompt_tokens INTEGER,
+          output_tokens INTEGER,
+          total_tokens INTEGER,
+          error TEXT
+        )
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_api_calls_created ON api_calls(created_at)")
+
+def _migrate_content_version(conn: sqlite3.Connection):
+    """6: content_version change counter (keys the in-process dedupe cache)"""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS content_version (
+          id INTEGER PRIMARY KEY CHECK (id = 1),
+          version INTEGER NOT NULL
+        )
+    """)
+    conn.execute("INSERT OR IGNORE INTO content_version (id, version) VALUES (1, 0)")
+    for event in ("INSERT", "UPDATE", "DELETE"):
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS content_ideas_version_{event.lower()} AFTER {event} ON content_ideas BEGIN
+              UPDATE content_version SET version = version + 1;
+            END
+        """)
+
+def _migrate_api_call_backend(conn: sqlite3.Connection):
+    """7: api_calls.backend/items so local embedding calls and cache hits are logged too"""
+    existing = {row[1] for row in conn.execute("PRAGMA table_info(api_calls)")}
+    if "backend" not in existing:
+        conn.execute("ALTER TABLE api_calls ADD COLUMN backend TEXT")
+        conn.execute("UPDATE api_calls SET backend = 'gemini'")
+    if "items" not in existing:
+        conn.execute("ALTER TABLE api_calls ADD COLUMN items INTEGER")
+
+# Ordered schema migrations; PRAGMA user_version counts how many have run.
+# Append only: schema.sql always holds the latest schema for new databases,
+# and each new entry upgrades an existing database to match it. Migration 1
+# runs the current schema.sql, so later ones must use IF NOT EXISTS.
+MIGRATIONS = [
+    _migrate_unversioned,
+    _migrate_listing_indexes,
+    _migrate_generation_jobs,
+    _migrate_llm_cache,
+    _migrate_api_calls,
+    _migrate_content_version,
+    _migrate_api_call_backend,
+]
+if len(MIGRATIONS) != SCHEMA_VERSION:
+    raise Exception(f"schema_version.SCHEMA_VERSION is {SCHEMA_VERSION} but there are {len(MIGRATIONS)} migrations")
 
 def init_db():
-    """Initialize SQLite database"""
-    conn = sqlite3.connect(DB_PATH)
-    with open(os.path.join(os.path.dirname(__file__), "schema.sql")) as f:
-        conn.executescript(f.read())
-    conn.commit()
-    conn.close()
+    """
+    Create or upgrade the database schema
+    Checks PRAGMA user_version and returns immediately when it's current; a new
+    database gets schema.sql, an older one runs the pending MIGRATIONS
+    """
+    conn = db.get_connection()
+    if conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION:
+        return
+    
+    with db.transaction():
+        # Re-read under the write lock: another process may have just migrated
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        if version > SCHEMA_VERSION:
+            raise Exception(f"{DB_PATH} has schema version {version}; this code supports up to {SCHEMA_VERSION}")
+        if version == SCHEMA_VERSION:
+            return
+        
+        is_new = not conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'content_ideas'"
+        ).fetchone()
+        if is_new:
+            _create_schema(conn)
+        else:
+            for migration in MIGRATIONS[version:]:
+                migration(conn)
+        
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+def encode_embedding(embedding: List[float]) -> bytes:
+    """Pack an embedding as little-endian float32 bytes"""
+    return np.asarray(embedding, dtype="<f4").tobytes()
+
+def decode_embedding(value, embedding_format: int) -> np.ndarray:
+    """Decode a stored embedding in either format (binary is zero-copy)"""
+    if embedding_format == EMBEDDING_FORMAT_F32:
+        return np.frombuffer(value, dtype="<f4")
+    return np.asarray(json.loads(value), dtype=np.float32)
+
+def migrate_embeddings() -> int:
+    """Convert legacy JSON embeddings to float32 BLOBs; returns rows converted"""
+    with db.transaction() as conn:
+        cursor = conn.cursor()
+        
+        cursor.execute("""
+            SELECT id, embedding FROM content_ideas
+            WHERE embedding IS NOT NULL AND embedding_format = ?
+        """, (EMBEDDING_FORMAT_JSON,))
+        rows = cursor.fetchall()
+        
+        cursor.executemany("""
+            UPDATE content_ideas SET embedding = ?, embedding_format = ?
+            WHERE id = ?
+        """, [
+            (encode_embedding(json.loads(embedding)), EMBEDDING_FORMAT_F32, idea_id)
+            for idea_id, embedding in rows
+        ])
+    
+    return len(rows)
+
+def normalize_text(text: str) -> str:
+    """Canonical form used as the embedding cache key (NFC, collapsed whitespace)"""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+_embedding_lru: "OrderedDict[Tuple[str, str], List[float]]" = OrderedDict()
+_embedding_lru_lock = threading.Lock()  # embeddings are fetched from worker threads
+
+def _cached_embedding(model: str, text_hash: str):
+    """Look up an embedding in the LRU, then the on-disk cache"""
+    key = (model, text_hash)
+    with _embedding_lru_lock:
+        embedding = _embedding_lru.get(key)
+        if embedding is not None:
+            _embedding_lru.move_to_end(key)
+            return embedding
+    
+    try:
+        row = db.get_connection().execute(
+            "SELECT embedding FROM embedding_cache WHERE model = ? AND text_hash = ?",
+            (model, text_hash)
+        ).fetchone()
+    except sqlite3.OperationalError:
+        return None  # DB not initialized yet
+    
+    if not row:
+        return None
+    embedding = np.frombuffer(row[0], dtype="<f4").tolist()
+    _remember_embedding(model, text_hash, embedding)
+    return embedding
+
+def _remember_embedding(model: str, text_hash: str, embedding: List[float]):
+    """Insert into the LRU, evicting the least recently used entry"""
+    with _embedding_lru_lock:
+        _embedding_lru[(model, text_hash)] = embedding
+        _embedding_lru.move_to_end((model, text_hash))
+        while len(_embedding_lru) > EMBEDDING_CACHE_SIZE:
+            _embedding_lru.popitem(last=False)
+
+def _store_embedding(model: str, text_hash: str, embedding: List[float]):
+    """Persist an embedding in the LRU and the on-disk cache"""
+    _remember_embedding(model, text_hash, embedding)
+    try:
+        db.get_connection().execute(
+            "INSERT OR REPLACE INTO embedding_cache (model, text_hash, embedding) VALUES (?, ?, ?)",
+            (model, text_hash, encode_embedding(embedding))
+        )
+    except sqlite3.OperationalError:
+        pass  # DB not initialized yet; the LRU still helps
+
+def _text_hash(text: str) -> str:
+    """Content address of a text for the embedding cache"""
+    return hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+
+def _log_embed(backend: str, endpoint: str, items: int, started: float, error: str = None):
+    """api_calls row for an embedding call that made no HTTP request (local backend, cache hit)"""
+    elapsed_ms = round((time.perf_counter() - started) * 1000, 3)
+    db.record_api_call(kind="embed", backend=backend, endpoint=endpoint, items=items, retries=0,
+                       latency_ms=elapsed_ms, total_ms=elapsed_ms, error=error)
+
+def _embed(backend: embeddings.EmbeddingBackend, texts: List[str], one: bool = False):
+    """backend.embed (or embed_one), logged unless the backend logs its own calls"""
+    if backend.logs_calls:
+        return backend.embed_one(texts[0]) if one else backend.embed(texts)
+    
+    started = time.perf_counter()
+    try:
+        result = backend.embed_one(texts[0]) if one else backend.embed(texts)
+    except Exception as e:
+        _log_embed(backend.name, f"{backend.model}:embed", len(texts), started, f"{type(e).__name__}: {e}"[:500])
+        raise
+    _log_embed(backend.name, f"{backend.model}:embed", len(texts), started)
+    return result
 
 def get_embedding(text: str) -> List[float]:
-    """Get embedding from Gemini API"""
-    if not GEMINI_API_KEY:
-        print("⚠️  GEMINI_API_KEY not set. Using mock embeddings.")
-        # Mock: simple hash-based vector for testing
-        h = hash(text.lower())
-        return [float((h >> i) & 0xFF) / 255.0 for i in range(0, 768, 8)]
-    
-    headers = {"Content-Type": "application/json"}
-    data = {
-        "content": {"parts": [{"text": text}]}
-    }
+    """Embed text with the active backend (cached by model + normalized text hash)"""
+    backend = embeddings.get_backend()
+    if not backend.cacheable:
+        return _embed(backend, [text], one=True)
     
-    response = requests.post(
-        f"{GEMINI_EMBED_URL}?key={GEMINI_API_KEY}",
-        headers=headers,
-        json=data
-    )
+    started = time.perf_counter()
+    text_hash = _text_hash(text)
+    cached = _cached_embedding(backend.model, text_hash)
+    if cached is not None:
+        _log_embed("cache", backend.model, 1, started)
+        return cached
     
-    if response.status_code != 200:
-        raise Exception(f"Gemini API error: {response.text}")
+    embedding = _embed(backend, [text], one=True)
+    _store_embedding(backend.model, text_hash, embedding)
+    return embedding
+
+def get_embeddings(texts: List[str]) -> List[List[float]]:
+    """
+    Embed many texts at once
+    Cache hits are served locally; each distinct miss is embedded once, in a
+    single backend call (Gemini: batched, bounded concurrency). Order is preserved.
+    """
+    backend = embeddings.get_backend()
+    if not backend.cacheable:
+        return _embed(backend, texts)
+    
+    started = time.perf_counter()
+    hashes = [_text_hash(text) for text in texts]
+    results = [_cached_embedding(backend.model, h) for h in hashes]
+    hits = sum(1 for cached in results if cached is not None)
+    if hits:
+        _log_embed("cache", backend.model, hits, started)
     
-    return response.json()["embedding"]["values"]
+    # Embed each distinct missing text once
+    missing = {}
+    for text, text_hash, cached in zip(texts, hashes, results):
+        if cached is None and text_hash not in missing:
+            missing[text_hash] = text
+    
+    fetched = dict(zip(missing, _embed(backend, list(missing.values())))) if missing else {}
+    for text_hash, embedding in fetched.items():
+        _store_embedding(backend.model, text_hash, embedding)
+    
+    return [
+        cached if cached is not None else fetched[text_hash]
+        for text_hash, cached in zip(hashes, results)
+    ]
 
 def cosine_similarity(a: List[float], b: List[float]) -> float:
     """Calculate cosine similarity between two vectors"""
@@ -65,91 +406,535 @@ def cosine_similarity(a: List[float], b: List[float]) -> float:
     b = np.array(b)
     return np.dot(a, b) / (np.linalg.norm(a) * np.linalg.norm(b))
 
-def keyword_similarity(new: Dict, existing: Dict) -> float:
-    """Calculate keyword-based similarity"""
-    def tokenize(text: str) -> set:
-        return set(re.findall(r'\w+', text.lower()))
-    
-    # Title similarity (30% of keyword score)
-    new_title = tokenize(new.get("title", ""))
-    old_title = tokenize(existing.get("title", ""))
-    title_sim = len(new_title & old_title) / max(len(new_title | old_title), 1)
-    
-    # Summary similarity (20% of keyword score)
-    new_summary = tokenize(new.get("summary", ""))
-    old_summary = tokenize(existing.get("summary", ""))
-    summary_sim = len(new_summary & old_summary) / max(len(new_summary | old_summary), 1)
-    
-    # Tag similarity (20% of keyword score)
-    new_tags = set(new.get("tags", "").split(","))
-    old_tags = set(existing.get("tags", "").split(","))
-    tag_sim = len(new_tags & old_tags) / max(len(new_tags | old_tags), 1)
+def tokenize(text: str) -> frozenset:
+    """Lowercased word tokens"""
+    return frozenset(re.findall(r'\w+', (text or "").lower()))
+
+def keyword_features(idea: Dict) -> Tuple[frozenset, frozenset, frozenset]:
+    """(title tokens, summary tokens, tags) used by the keyword score"""
+    return (
+        tokenize(idea.get("title", "")),
+        tokenize(idea.get("summary", "")),
+        frozenset((idea.get("tags") or "").split(","))
+    )
+
+def encode_keyword_features(features: Tuple[frozenset, frozenset, frozenset]) -> Tuple[str, str, str]:
+    """Compact column form: space-joined words, comma-joined tags"""
+    title, summary, tags = features
+    return " ".join(sorted(title)), " ".join(sorted(summary)), ",".join(sorted(tags))
+
+def decode_keyword_features(title: str, summary: str, tags: str) -> Tuple[frozenset, frozenset, frozenset]:
+    """Inverse of encode_keyword_features"""
+    return frozenset(title.split()), frozenset(summary.split()), frozenset(tags.split(","))
+
+def backfill_keyword_features(conn: sqlite3.Connection):
+    """Compute stored token columns for rows saved before they existed"""
+    rows = conn.execute("""
+        SELECT id, title, summary, tags FROM content_ideas
+        WHERE title_tokens IS NULL
+    """).fetchall()
+    conn.executemany("""
+        UPDATE content_ideas SET title_tokens = ?, summary_tokens = ?, tag_tokens = ?
+        WHERE id = ?
+    """, [
+        (*encode_keyword_features(keyword_features({"title": r[1], "summary": r[2], "tags": r[3]})), r[0])
+        for r in rows
+    ])
+
+def _jaccard(a: frozenset, b: frozenset) -> float:
+    """Intersection over union"""
+    return len(a & b) / max(len(a | b), 1)
+
+def keyword_score(new: Tuple[frozenset, frozenset, frozenset],
+                  existing: Tuple[frozenset, frozenset, frozenset]) -> float:
+    """Keyword similarity from precomputed features (pure set intersections)"""
+    # Title (30%), summary (20%), tags (20%) of the keyword score
+    title_sim = _jaccard(new[0], existing[0])
+    summary_sim = _jaccard(new[1], existing[1])
+    tag_sim = _jaccard(new[2], existing[2])
     
     # Weighted average
     return (title_sim * 0.3 + summary_sim * 0.2 + tag_sim * 0.2) / 0.7
 
+def keyword_similarity(new: Dict, existing: Dict) -> float:
+    """Calculate keyword-based similarity"""
+    return keyword_score(keyword_features(new), keyword_features(existing))
+
 def generate_slug(title: str) -> str:
     """Generate URL-friendly slug"""
     slug = re.sub(r'[^\w\s-]', '', title.lower())
     slug = re.sub(r'[-\s]+', '-', slug)
     return slug[:60].strip('-')
 
-def get_next_id() -> str:
-    """Generate next ID in YYYY-MM-DD-NNN format"""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
+def get_next_id(conn: sqlite3.Connection = None) -> str:
+    """
+    Allocate the next ID in YYYY-MM-DD-NNN format
+    A single upsert on id_counters bumps and returns today's sequence number,
+    so concurrent writers never get the same ID. The counter is seeded from
+    existing content_ideas rows the first time a date is seen.
+    """
+    cursor = (conn or db.get_connection()).cursor()
     today = datetime.now().strftime("%Y-%m-%d")
     
+    cursor.execute("""
+        INSERT INTO id_counters (date, last_seq)
+        VALUES (?, (
+            SELECT COALESCE(MAX(CAST(substr(id, 12) AS INTEGER)), 0) + 1
+            FROM content_ideas WHERE date = ?
+        ))
+        ON CONFLICT(date) DO UPDATE SET last_seq = last_seq + 1
+        RETURNING last_seq
+    """, (today, today))
+    seq = cursor.fetchone()[0]
+    
+    return f"{today}-{seq:03d}"
+
+def resolve_slug(slug: str, conn: sqlite3.Connection = None) -> str:
+    """Return `slug`, or the first free `slug-N`, using a single query"""
+    cursor = (conn or db.get_connection()).cursor()
+    
+    # Slugs only contain \w and '-', so they never hold GLOB wildcards
     cursor.execute(
-        "SELECT id FROM content_ideas WHERE date = ? ORDER BY id DESC LIMIT 1",
-        (today,)
+        "SELECT slug FROM content_ideas WHERE slug = ? OR slug GLOB ?",
+        (slug, f"{slug}-*")
     )
-    result = cursor.fetchone()
-    conn.close()
+    taken = {row[0] for row in cursor.fetchall()}
     
-    if result:
-        last_num = int(result[0].split('-')[-1])
-        return f"{today}-{last_num + 1:03d}"
-    return f"{today}-001"
+    if slug not in taken:
+        return slug
+    counter = 1
+    while f"{slug}-{counter}" in taken:
+        counter += 1
+    return f"{slug}-{counter}"
 
-def check_duplicates(idea: Dict) -> Tuple[bool, List[Dict]]:
+def backfill_embedding_models(conn: sqlite3.Connection):
     """
-    Check if idea is duplicate using hybrid similarity
-    Returns: (is_duplicate, similar_ideas)
+    Label embeddings stored before embedding_model existed
+    3072-dim vectors came from Gemini unless they are exactly the local hashing
+    backend's output; anything else is the old salted-hash mock and can only
+    be re-embedded.
     """
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
+    hashing = embeddings.HashingBackend()
+    rows = conn.execute("""
+        SELECT id, title, summary, embedding, embedding_format FROM content_ideas
+        WHERE embedding IS NOT NULL AND embedding_model IS NULL
+    """).fetchall()
     
+    updates = []
+    for idea_id, title, summary, embedding, embedding_format in rows:
+        vector = decode_embedding(embedding, embedding_format)
+        if len(vector) != embeddings.GEMINI_EMBED_DIM:
+            model = f"legacy-mock-{len(vector)}"
+        elif np.allclose(vector, hashing.vector(f"{title} {summary}")):
+            model = hashing.model
+        else:
+            model = embeddings.GeminiBackend.model
+        updates.append((model, idea_id))
+    
+    conn.executemany("UPDATE content_ideas SET embedding_model = ? WHERE id = ?", updates)
+
+def _count_embedded(cursor, model: str) -> Tuple[int, int]:
+    """(ideas with an embedding, how many of those came from `model`)"""
     cursor.execute("""
-        SELECT id, title, summary, tags, embedding, status
+        SELECT COUNT(*), COALESCE(SUM(embedding_model = ?), 0)
         FROM content_ideas
-        WHERE status != 'rejected'
-    """)
+        WHERE embedding IS NOT NULL
+    """, (model,))
+    return tuple(cursor.fetchone())
+
+def _index_is_current(index: VectorIndex, model: str) -> bool:
+    """True if the index holds every stored `model` vector"""
+    if index is None or index.model != model:
+        return False
+    total, matching = _count_embedded(db.get_connection().cursor(), model)
+    return len(index) == matching and index.n_skipped == total - matching
+
+def rebuild_index(model: str = None) -> VectorIndex:
+    """
+    Rebuild the vector index from stored embeddings of one model
+    (default: the active backend); vectors from other models are never mixed in
+    """
+    model = model or embeddings.get_backend().model
+    cursor = db.get_connection().cursor()
+    total, matching = _count_embedded(cursor, model)
     
-    new_embedding = get_embedding(f"{idea['title']} {idea['summary']}")
-    similar = []
+    # Stream rows straight into one preallocated matrix (no per-row copies held)
+    ids, vectors = [], None
+    for idea_id, embedding, embedding_format in cursor.execute("""
+        SELECT id, embedding, embedding_format
+        FROM content_ideas
+        WHERE embedding IS NOT NULL AND embedding_model = ?
+    """, (model,)):
+        vector = decode_embedding(embedding, embedding_format)
+        if vectors is None:
+            vectors = np.empty((matching, len(vector)), dtype=np.float32)
+        vectors[len(ids)] = vector
+        ids.append(idea_id)
+    
+    if ids:
+        index = VectorIndex.build(ids, vectors[:len(ids)])
+    else:
+        index = VectorIndex(0)
+    index.model = model
+    index.n_skipped = total - len(ids)
+    index.save(INDEX_PATH)
+    return index
+
+def load_index(model: str) -> VectorIndex:
+    """Load the vector index, rebuilding it if stale or built for another model"""
+    index = VectorIndex.load(INDEX_PATH)
+    if not _index_is_current(index, model):
+        index = rebuild_index(model)
+    elif index.n_delta >= INDEX_DELTA_MAX:
+        index.save(INDEX_PATH)
+    return index
+
+def _index_add(idea_id: str, embedding: List[float], index: VectorIndex) -> VectorIndex:
+    """
+    Add a committed idea (already in the delta file) to an in-memory index
+    Runs after save_idea's transaction: add() may retrain the clusters and
+    the index file is rewritten once the delta passes INDEX_DELTA_MAX rows,
+    neither of which may hold the write lock. Returns the index.
+    """
+    index.add(idea_id, embedding)
+    index.n_delta += 1
+    if index.n_delta >= INDEX_DELTA_MAX:
+        index.save(INDEX_PATH)
+    return index
+
+def _lease_stamp(seconds_ago: float = 0) -> str:
+    """UTC timestamp in CURRENT_TIMESTAMP's sortable form, to the microsecond"""
+    return (datetime.utcnow() - timedelta(seconds=seconds_ago)).strftime("%Y-%m-%d %H:%M:%S.%f")
+
+def _lease_held(name: str) -> bool:
+    """True while another run holds the worker's checkpoint row"""
+    row = db.get_connection().execute(
+        "SELECT updated_at >= ? FROM worker_checkpoints WHERE name = ?",
+        (_lease_stamp(REEMBED_LEASE_SECONDS), name)
+    ).fetchone()
+    return bool(row and row[0])
+
+def _claim_checkpoint(name: str, model: str, restart: bool = False) -> Optional[Tuple[str, int]]:
+    """
+    Take the lease on a worker's checkpoint row so only one process runs it
+    Claimable when free or not renewed for REEMBED_LEASE_SECONDS (its holder
+    died). Returns (lease, rowid to resume after) or None if it is held.
+    The lease is the row's updated_at; each checkpoint renews it.
+    """
+    lease = _lease_stamp()
+    with db.transaction() as conn:
+        conn.execute("""
+            INSERT OR IGNORE INTO worker_checkpoints (name, model, position, updated_at)
+            VALUES (?, ?, 0, '')
+        """, (name, model))
+        claimed = conn.execute("""
+            UPDATE worker_checkpoints SET updated_at = ?
+            WHERE name = ? AND updated_at < ?
+        """, (lease, name, _lease_stamp(REEMBED_LEASE_SECONDS))).rowcount
+        if not claimed:
+            return None
+        
+        row = conn.execute("SELECT position, model FROM worker_checkpoints WHERE name = ?", (name,)).fetchone()
+        position = row[0] if row[1] == model and not restart else 0
+        conn.execute("UPDATE worker_checkpoints SET model = ?, position = ? WHERE name = ?", (model, position, name))
+    return lease, position
+
+def _renew_checkpoint(conn: sqlite3.Connection, name: str, lease: str, position: int) -> str:
+    """Record progress and renew the lease (inside the caller's transaction); returns the new lease"""
+    renewed = _lease_stamp()
+    updated = conn.execute("""
+        UPDATE worker_checkpoints SET position = ?, updated_at = ?
+        WHERE name = ? AND updated_at = ?
+    """, (position, renewed, name, lease)).rowcount
+    if not updated:
+        raise Exception(f"Lost the {name} lease to another process")
+    return renewed
+
+def reembed(chunk_size: int = 100, concurrency: int = embeddings.EMBED_CONCURRENCY,
+            restart: bool = False, verbose: bool = True) -> Dict:
+    """
+    Re-embed every idea whose vector is missing or came from another model
+    Rows stream in rowid order, `chunk_size` at a time; up to `concurrency`
+    chunks are embedded at once and written back in order, each in its own
+    transaction together with a checkpoint, so an interrupted run resumes
+    where it stopped. Only one process runs at a time (lease on the
+    checkpoint row); if another holds it this returns at once with busy=True.
+    Returns {processed, seconds, rows_per_sec, busy}.
+    """
+    backend = embeddings.get_backend()
+    conn = db.get_connection()
+    claim = _claim_checkpoint("reembed", backend.model, restart)
+    if claim is None:
+        if verbose:
+            print("⏳ Another process is already re-embedding")
+        return {"processed": 0, "seconds": 0.0, "rows_per_sec": 0.0, "busy": True}
+    lease, position = claim
+    if position and verbose:
+        print(f"↪️  Resuming after rowid {position}")
+    
+    def read_chunk(after: int) -> List[Tuple]:
+        return conn.execute("""
+            SELECT rowid, id, title, summary FROM content_ideas
+            WHERE rowid > ? AND (embedding IS NULL OR embedding_model IS NOT ?)
+            ORDER BY rowid
+            LIMIT ?
+        """, (after, backend.model, chunk_size)).fetchall()
+    
+    processed = 0
+    started = time.monotonic()
+    in_flight = deque()
+    exhausted = False
+    finished = False
     
+    try:
+        with ThreadPoolExecutor(max_workers=max(concurrency, 1)) as pool:
+            while True:
+                while not exhausted and len(in_flight) < max(concurrency, 1):
+                    rows = read_chunk(position)
+                    if not rows:
+                        exhausted = True
+                        break
+                    position = rows[-1][0]
+                    texts = [f"{title} {summary}" for _, _, title, summary in rows]
+                    in_flight.append((rows, pool.submit(_embed, backend, texts)))
+                
+                if not in_flight:
+                    break
+                
+                rows, future = in_flight.popleft()
+                vectors = future.result()
+                with db.transaction():
+                    conn.executemany("""
+                        UPDATE content_ideas
+                        SET embedding = ?, embedding_format = ?, embedding_model = ?
+                        WHERE id = ?
+                    """, [
+                        (encode_embedding(vector), EMBEDDING_FORMAT_F32, backend.model, row[1])
+                        for row, vector in zip(rows, vectors)
+                    ])
+                    lease = _renew_checkpoint(conn, "reembed", lease, rows[-1][0])
+                
+                processed += len(rows)
+                invalidate_cache()
+                if verbose:
+                    elapsed = time.monotonic() - started
+                    print(f"🔄 {processed} re-embedded ({processed / max(elapsed, 1e-9):.1f} rows/s)")
+        
+        # Finished: the next run starts from the beginning
+        with db.transaction():
+            conn.execute("DELETE FROM worker_checkpoints WHERE name = 'reembed' AND updated_at = ?", (lease,))
+        finished = True
+    finally:
+        if not finished:
+            # Keep the position but free the lease so the next run can resume now
+            with db.transaction():
+                conn.execute("UPDATE worker_checkpoints SET updated_at = '' WHERE name = 'reembed' AND updated_at = ?", (lease,))
+    
+    seconds = time.monotonic() - started
+    return {
+        "processed": processed,
+        "seconds": round(seconds, 3),
+        "rows_per_sec": round(processed / seconds, 1) if seconds else 0.0,
+        "busy": False
+    }
+
+_reembed_thread = None
+_reembed_lock = threading.Lock()
+
+def start_background_reembed():
+    """
+    Re-embed other-model rows on a background thread (at most one at a time)
+    For long-lived processes (pipeline_daemon.py); short-lived CLI runs would
+    kill the thread at exit and should call start_reembed_process() instead
+    """
+    global _reembed_thread
+    with _reembed_lock:
+        if _reembed_thread is not None:
+            return
+        
+        def run():
+            global _reembed_thread
+            try:
+                reembed(verbose=False)
+            except Exception as e:
+                print(f"⚠️  Background re-embedding stopped: {e}")
+            finally:
+                with _reembed_lock:
+                    _reembed_thread = None
+        
+        _reembed_thread = threading.Thread(target=run, name="reembed", daemon=True)
+        _reembed_thread.start()
+
+def stale_embeddings() -> int:
+    """Ideas whose stored vector came from another model than the active backend"""
+    index, _ = load_candidates(embeddings.get_backend().model)
+    return index.n_skipped
+
+def reembed_needed() -> bool:
+    """
+    True if other-model rows should be migrated to the active backend
+    Only when EMBEDDING_BACKEND is set explicitly: the implicit hash fallback
+    of a keyless run must never overwrite the stored Gemini vectors
+    """
+    if not os.getenv("EMBEDDING_BACKEND"):
+        return False
+    return stale_embeddings() > 0
+
+def start_reembed_process() -> bool:
+    """
+    Spawn a detached `pipeline.py reembed` if rows need migrating
+    For short-lived CLI runs, which would otherwise block until the whole
+    table is re-embedded. Returns True if a process was started.
+    """
+    if not reembed_needed() or _lease_held("reembed"):
+        return False
+    subprocess.Popen(
+        [sys.executable, os.path.abspath(__file__), "reembed"],
+        stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        start_new_session=True
+    )
+    return True
+
+def _content_version() -> int:
+    """
+    Change counter of content_ideas (covers writes from other processes)
+    Bumped by triggers on content_ideas only, so writes to the caches, job
+    queue or api_calls log don't invalidate the dedupe cache
+    """
+    return db.get_connection().execute("SELECT version FROM content_version").fetchone()[0]
+
+# In-process dedupe cache: vector index + metadata of non-rejected ideas
+_candidate_cache = {"version": None, "model": None, "index": None, "ideas": None}
+# Guards reads and swaps of the entries (the background re-embed invalidates from its thread)
+_candidate_lock = threading.Lock()
+
+def invalidate_cache():
+    """Drop the in-process dedupe cache (called after writes)"""
+    with _candidate_lock:
+        _candidate_cache.update(version=None, model=None, index=None, ideas=None)
+
+def _cache_snapshot() -> Dict:
+    """Consistent copy of the dedupe cache entries"""
+    with _candidate_lock:
+        return dict(_candidate_cache)
+
+def load_candidates(model: str) -> Tuple[VectorIndex, Dict[str, Dict]]:
+    """
+    Return the vector index for `model` and {id: idea} for non-rejected ideas
+    Cached in-process until content_ideas changes
+    """
+    version = _content_version()
+    cache = _cache_snapshot()
+    if version == cache["version"] and model == cache["model"]:
+        return cache["index"], cache["ideas"]
+    
+    index = load_index(model)
+    
+    cursor = db.get_connection().cursor()
+    cursor.execute("""
+        SELECT id, title, summary, tags, status, title_tokens, summary_tokens, tag_tokens
+        FROM content_ideas
+        WHERE status != 'rejected'
+    """)
+    ideas = {}
     for row in cursor.fetchall():
-        existing = {
+        idea = {
             "id": row[0],
             "title": row[1],
             "summary": row[2],
             "tags": row[3],
-            "embedding": json.loads(row[4]) if row[4] else None,
-            "status": row[5]
+            "status": row[4]
         }
-        
-        if not existing["embedding"]:
+        if row[5] is not None:
+            idea["features"] = decode_keyword_features(row[5], row[6], row[7])
+        else:
+            idea["features"] = keyword_features(idea)
+        ideas[row[0]] = idea
+    
+    with _candidate_lock:
+        _candidate_cache.update(version=version, model=model, index=index, ideas=ideas)
+    return index, ideas
+
+def keyword_candidates(idea: Dict, limit: int = KEYWORD_TOP_K) -> List[str]:
+    """IDs of ideas sharing at least one token with `idea`, best BM25 first"""
+    title, summary, tags = keyword_features(idea)
+    words = title | summary | tokenize(" ".join(tags))
+    if not words:
+        return []
+    
+    # Quote each token so FTS5 never parses it as an operator
+    query = " OR ".join(f'"{word}"' for word in sorted(words))
+    rows = db.get_connection().execute("""
+        SELECT id FROM content_ideas_fts
+        WHERE content_ideas_fts MATCH ?
+        ORDER BY bm25(content_ideas_fts, 0.0, 3.0, 2.0, 2.0)
+        LIMIT ?
+    """, (query, limit)).fetchall()
+    return [row[0] for row in rows]
+
+def check_duplicates(idea: Dict, embedding: List[float] = None,
+                     mode: str = "all", top_k: int = None) -> Tuple[bool, List[Dict]]:
+    """
+    Check if idea is duplicate using hybrid similarity
+    Candidates are the vector top-k (one matrix-vector product over the cached,
+    pre-normalized index) plus the full-text top-k (BM25), so the scored set
+    stays bounded regardless of table size
+    Pass `embedding` to skip the embedding lookup (e.g. bulk import)
+    Keyword candidates embedded by another model are embedded with the active
+    one on the spot, so a model switch never hides existing ideas
+    
+    Candidates are visited by descending semantic score. The keyword term is at
+    most 1.0, so once 0.7 * semantic + 0.3 can no longer beat the threshold (or
+    the current k-th best match) the remaining rows are skipped.
+      mode="all":   every match above the threshold (default)
+      mode="first": stop at the first match; use when only the verdict matters
+      top_k=N:      only the N best matches
+    Returns: (is_duplicate, similar_ideas)
+    """
+    if mode not in ("all", "first"):
+        raise ValueError(f"Unknown dedupe mode: {mode}")
+    
+    new_embedding = embedding if embedding is not None else get_embedding(f"{idea['title']} {idea['summary']}")
+    index, ideas = load_candidates(embeddings.get_backend().model)
+    
+    # Rejected ideas stay in the index, so over-fetch by that many
+    k = DEDUPE_TOP_K + max(len(index) - len(ideas), 0)
+    new_features = keyword_features(idea)
+    
+    semantic = dict(index.search(new_embedding, k))
+    keyword_ids = [i for i in keyword_candidates(idea) if i not in semantic]
+    semantic.update(index.similarities(new_embedding, keyword_ids))
+    
+    # Keyword matches with no vector from the active model (embedded by another
+    # model and not re-embedded yet): embed them now rather than drop them
+    stale = [ideas[i] for i in keyword_ids if i not in semantic and i in ideas]
+    if stale:
+        vectors = normalize(get_embeddings([f"{e['title']} {e['summary']}" for e in stale]))
+        query = normalize(new_embedding).reshape(-1)
+        for existing, vector in zip(stale, vectors):
+            if vector.shape == query.shape:
+                semantic[existing["id"]] = float(vector @ query)
+    
+    similar = []
+    
+    for idea_id, semantic_score in sorted(semantic.items(), key=lambda x: x[1], reverse=True):
+        existing = ideas.get(idea_id)
+        if existing is None:
             continue
         
-        # Semantic similarity (70%)
-        semantic_score = cosine_similarity(new_embedding, existing["embedding"])
+        # Best case: keyword similarity of 1.0
+        upper_bound = (semantic_score * 0.7) + 0.3
+        floor = DUPLICATE_THRESHOLD
+        if top_k and len(similar) >= top_k:
+            floor = max(floor, similar[top_k - 1]["score"])
+        if upper_bound <= floor:
+            break
         
         # Keyword similarity (30%)
-        keyword_score = keyword_similarity(idea, existing)
+        keyword_sim = keyword_score(new_features, existing["features"])
         
-        # Combined score
-        combined_score = (semantic_score * 0.7) + (keyword_score * 0.3)
+        # Combined score (semantic 70%)
+        combined_score = (semantic_score * 0.7) + (keyword_sim * 0.3)
         
         if combined_score > DUPLICATE_THRESHOLD:
             similar.append({
@@ -158,47 +943,72 @@ def check_duplicates(idea: Dict) -> Tuple[bool, List[Dict]]:
                 "score": combined_score,
                 "status": existing["status"]
             })
+            if mode == "first":
+                break
+            similar.sort(key=lambda x: x["score"], reverse=True)
     
-    conn.close()
+    if top_k:
+        similar = similar[:top_k]
     is_duplicate = len(similar) > 0
-    return is_duplicate, sorted(similar, key=lambda x: x["score"], reverse=True)
+    return is_duplicate, similar
 
-def save_idea(idea: Dict, embedding: List[float]) -> str:
-    """Save idea to database"""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
+def save_idea(idea: Dict, embedding: List[float], model: str = None) -> str:
+    """
+    Save idea to database (ID allocation, slug check and insert in one transaction)
+    `model` is the embedding's model (default: the active backend)
+    """
+    model = model or embeddings.get_backend().model
+    with db.transaction() as conn:
+        cursor = conn.cursor()
+        
+        # Dedupe cache still matches the database: extend it instead of reloading
+        cache = _cache_snapshot()
+        warm = cache["version"] == _content_version() and cache["model"] == model
+        
+        idea_id = get_next_id(conn)
+        slug = resolve_slug(generate_slug(idea["title"]), conn)
+        
+        cursor.execute("""
+            INSERT INTO content_ideas 
+            (id, date, type, title, slug, summary, tags, status, embedding, embedding_format,
+             embedding_model, title_tokens, summary_tokens, tag_tokens)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, (
+            idea_id,
+            idea_id[:10],  # date the ID was allocated for
+            idea.get("type", "short"),
+            idea["title"],
+            slug,
+            idea["summary"],
+            idea.get("tags", ""),
+            "pitched",
+            encode_embedding(embedding),
+            EMBEDDING_FORMAT_F32,
+            model,
+            *encode_keyword_features(keyword_features(idea))
+        ))
     
-    idea_id = get_next_id()
-    slug = generate_slug(idea["title"])
+        # Only the O(dim) delta record inside the transaction; a stale index file
+        # or a delta from a rolled-back insert fails _index_is_current and is rebuilt
+        append_delta(INDEX_PATH, idea_id, embedding)
+        version = _content_version()
     
-    # Handle duplicate slugs
-    counter = 1
-    original_slug = slug
-    while True:
-        cursor.execute("SELECT id FROM content_ideas WHERE slug = ?", (slug,))
-        if not cursor.fetchone():
-            break
-        slug = f"{original_slug}-{counter}"
-        counter += 1
-    
-    cursor.execute("""
-        INSERT INTO content_ideas 
-        (id, date, type, title, slug, summary, tags, status, embedding)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-    """, (
-        idea_id,
-        datetime.now().strftime("%Y-%m-%d"),
-        idea.get("type", "short"),
-        idea["title"],
-        slug,
-        idea["summary"],
-        idea.get("tags", ""),
-        "pitched",
-        json.dumps(embedding)
-    ))
-    
-    conn.commit()
-    conn.close()
+    if warm:
+        index = _index_add(idea_id, embedding, cache["index"])
+        with _candidate_lock:
+            # Only if nothing invalidated or reloaded the cache since the snapshot
+            if _candidate_cache["index"] is cache["index"] and _candidate_cache["version"] == cache["version"]:
+                cache["ideas"][idea_id] = {
+                    "id": idea_id,
+                    "title": idea["title"],
+                    "summary": idea["summary"],
+                    "tags": idea.get("tags", ""),
+                    "status": "pitched",
+                    "features": keyword_features(idea)
+                }
+                _candidate_cache.update(version=version, index=index)
+    else:
+        invalidate_cache()
     
     return idea_id
 
@@ -239,8 +1049,9 @@ def create_task(idea: Dict, idea_id: str, research: Dict):
     
     return task_file
 
-def format_research_results(twitter_results: List, kb_results: List, web_results: List) -> Dict:
-    """Format research results for task"""
+def format_research_results(twitter_results: List = None, kb_results: List = None,
+                            web_results: List = None) -> Dict:
+    """Format research results as markdown sections for the task file"""
     research = {}
     
     # Twitter
@@ -250,6 +1061,8 @@ def format_research_results(twitter_results: List, kb_results: List, web_results
             for r in twitter_results[:5]
         ])
         research['twitter'] = twitter_md
+    else:
+        research['twitter'] = "No Twitter results"
     
     # KB
     if kb_results:
@@ -258,6 +1071,8 @@ def format_research_results(twitter_results: List, kb_results: List, web_results
             for r in kb_results[:3]
         ])
         research['kb'] = kb_md
+    else:
+        research['kb'] = "No related content in KB"
     
     # Web
     if web_results:
@@ -266,16 +1081,55 @@ def format_research_results(twitter_results: List, kb_results: List, web_results
             for r in web_results[:5]
         ])
         research['web'] = web_md
+    else:
+        research['web'] = "No web results"
     
     return research
 
+def import_ideas(path: str) -> Dict:
+    """
+    Bulk import ideas from a JSON-lines file
+    Each line: {"title", "summary"?, "tags"?, "type"?}. All texts are embedded
+    in one batch pass, then each idea is deduped (against the DB and earlier
+    lines of the file) and saved with a task file.
+    Returns: {saved: [ids], duplicates: [{title, matches}]}
+    """
+    ideas = []
+    with open(path) as f:
+        for line in f:
+            if not line.strip():
+                continue
+            raw = json.loads(line)
+            ideas.append({
+                "title": raw["title"],
+                "summary": raw.get("summary") or raw["title"],
+                "type": raw.get("type", "short"),
+                "tags": raw.get("tags", "")
+            })
+    
+    embeddings = get_embeddings([f"{idea['title']} {idea['summary']}" for idea in ideas])
+    
+    saved, duplicates = [], []
+    for idea, embedding in zip(ideas, embeddings):
+        is_dup, similar = check_duplicates(idea, embedding)
+        if is_dup:
+            duplicates.append({"title": idea["title"], "matches": similar})
+            continue
+        idea_id = save_idea(idea, embedding)
+        create_task(idea, idea_id, {})
+        saved.append(idea_id)
+    
+    return {"saved": saved, "duplicates": duplicates}
+
 # CLI for testing
 if __name__ == "__main__":
-    import sys
-    
     if len(sys.argv) < 2:
         print("Usage: python pipeline.py init")
         print("       python pipeline.py test 'idea title' 'summary' 'tags'")
+        print("       python pipeline.py reindex")
+        print("       python pipeline.py migrate-embeddings")
+        print("       python pipeline.py import <file.jsonl>")
+        print("       python pipeline.py reembed [chunk_size] [concurrency] [--restart]")
         sys.exit(1)
     
     command = sys.argv[1]
@@ -284,6 +1138,41 @@ if __name__ == "__main__":
         init_db()
         print("✅ Database initialized")
     
+    elif command == "reindex":
+        index = rebuild_index()
+        print(f"✅ Vector index rebuilt: {len(index)} {index.model} vectors ({index.n_skipped} from other models)")
+    
+    elif command == "migrate-embeddings":
+        init_db()
+        converted = migrate_embeddings()
+        print(f"✅ Converted {converted} embedding(s) to float32")
+    
+    elif command == "reembed":
+        init_db()
+        args = [a for a in sys.argv[2:] if not a.startswith("--")]
+        chunk_size = int(args[0]) if args else 100
+        concurrency = int(args[1]) if len(args) > 1 else embeddings.EMBED_CONCURRENCY
+        
+        print(f"🧠 Re-embedding with {embeddings.get_backend().model}...")
+        result = reembed(chunk_size, concurrency, restart="--restart" in sys.argv)
+        if result["busy"]:
+            sys.exit(0)
+        print(f"✅ {result['processed']} idea(s) in {result['seconds']}s ({result['rows_per_sec']} rows/s)")
+    
+    elif command == "import":
+        if len(sys.argv) < 3:
+            print("Usage: python pipeline.py import <file.jsonl>")
+            sys.exit(1)
+        
+        init_db()
+        result = import_ideas(sys.argv[2])
+        print(f"💾 Saved {len(result['saved'])} idea(s)")
+        for dup in result["duplicates"]:
+            best = dup["matches"][0]
+            print(f"  ❌ {dup['title']} → {best['title']} ({best['score']:.1%} similarity)")
+        if start_reembed_process():
+            print("🧠 Re-embedding other-model ideas in the background")
+    
     elif command == "test":
         if len(sys.argv) < 4:
             print("Usage: python pipeline.py test 'title' 'summary' 'tags'")
@@ -307,3 +1196,5 @@ if __name__ == "__main__":
             embedding = get_embedding(f"{idea['title']} {idea['summary']}")
             idea_id = save_idea(idea, embedding)
             print(f"💾 Saved as: {idea_id}")
+        if start_reembed_process():
+            print("🧠 Re-embedding other-model ideas in the background")
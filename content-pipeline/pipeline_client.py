@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Thin client for pipeline_daemon.py
+Standard library only, so a call costs interpreter start plus one socket
+round trip; the daemon keeps the DB, vector index and HTTP session warm
+"""
+
+import os
+import sys
+import json
+import socket
+from typing import Dict
+
+SOCKET_PATH = os.getenv("IDEAS_SOCKET", os.path.join(os.path.dirname(os.path.abspath(__file__)), "pipeline.sock"))
+
+class DaemonError(Exception):
+    """The daemon ran the operation and it raised"""
+
+def call(op: str, timeout: float = 600.0, **args) -> Dict:
+    """
+    Run one operation on the daemon and return its result
+    Raises ConnectionError when no daemon is listening, DaemonError when the
+    operation itself failed
+    """
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout)
+            sock.connect(SOCKET_PATH)
+            sock.sendall(json.dumps({"op": op, "args": args}).encode("utf-8") + b"\n")
+            with sock.makefile("rb") as reader:
+                line = reader.readline()
+    except (FileNotFoundError, ConnectionRefusedError) as e:
+        raise ConnectionError(f"No pipeline daemon at {SOCKET_PATH} (start it with: python pipeline_daemon.py)") from e
+
+    if not line:
+        raise ConnectionError("Pipeline daemon closed the connection")
+    response = json.loads(line)
+    if not response["ok"]:
+        raise DaemonError(response["error"])
+    return response["result"]
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage:")
+        print("  python pipeline_client.py process 'topic | tags' [type]")
+        print("  python pipeline_client.py research 'title' 'summary' [tags] [type] [research_json]")
+        print("  python pipeline_client.py list [status] [limit]")
+        print("  python pipeline_client.py view <idea_id>")
+        print("  python pipeline_client.py approve <idea_id>")
+        print("  python pipeline_client.py reject <idea_id> [reason]")
+        print("  python pipeline_client.py ping")
+        sys.exit(1)
+
+    command, rest = sys.argv[1], sys.argv[2:]
+
+    if command == "process" and rest:
+        request = {"topic": rest[0], "idea_type": rest[1] if len(rest) > 1 else "short"}
+    elif command == "research" and len(rest) >= 2:
+        research = json.loads(rest[4]) if len(rest) > 4 else {}
+        request = {
+            "title": rest[0],
+            "summary": rest[1],
+            "tags": rest[2] if len(rest) > 2 else "",
+            "idea_type": rest[3] if len(rest) > 3 else "short",
+            "twitter_results": research.get("twitter", []),
+            "kb_results": research.get("kb", []),
+            "web_results": research.get("web", []),
+        }
+    elif command == "list":
+        request = {"status": rest[0] if rest else None, "limit": int(rest[1]) if len(rest) > 1 else 10}
+    elif command in ("view", "approve") and rest:
+        request = {"idea_id": rest[0]}
+    elif command == "reject" and rest:
+        request = {"idea_id": rest[0], "reason": " ".join(rest[1:]) or None}
+    elif command == "ping":
+        request = {}
+    else:
+        print(f"Unknown command or missing arguments: {command}")
+        sys.exit(1)
+
+    try:
+        result = call(command, **request)
+    except ConnectionError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        sys.exit(2)
+    except DaemonError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        sys.exit(1)
+
+    if command == "list":
+        print(result["formatted"])
+    else:
+        print(json.dumps(result, indent=2))
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Resident pipeline daemon
+Serves process/research/list/view/approve/reject over a Unix socket so each
+OpenClaw action skips interpreter start, imports, DB open and index load.
+Protocol: one JSON object per line, {"op": ..., "args": {...}} in and
+{"ok": true, "result": ...} or {"ok": false, "error": ...} out.
+"""
+
+import os
+import sys
+import json
+import signal
+import socket
+import threading
+import socketserver
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict
+import db
+import embeddings
+import gemini_client
+import manage
+import pipeline
+from openclaw_interface import process_with_research
+from pipeline_client import SOCKET_PATH
+from process_idea import process_content_idea
+
+# Long-lived worker threads: each keeps its thread-local DB connection open
+WORKER_THREADS = int(os.getenv("DAEMON_WORKERS", "4"))
+
+# Dedupe + save must not interleave, or two near-duplicates could both pass
+_ingest_lock = threading.Lock()
+
+def _ingest(fn: Callable) -> Callable:
+    def run(**args):
+        with _ingest_lock:
+            result = fn(**args)
+            _reembed_if_stale()
+        return result
+    return run
+
+def _reembed_if_stale():
+    """The daemon outlives the work, so it re-embeds other-model rows in the background"""
+    if pipeline.reembed_needed():
+        pipeline.start_background_reembed()
+
+def _list(status: str = None, limit: int = 10, **filters) -> Dict:
+    ideas = manage.list_ideas(status, limit, **filters)
+    return {"ideas": ideas, "formatted": manage.format_idea_list(ideas)}
+
+def _ping() -> Dict:
+    return {"pid": os.getpid(), "db": db.DB_PATH, "embedding_model": embeddings.get_backend().model}
+
+# op name -> handler(**args)
+OPS: Dict[str, Callable] = {
+    "process": _ingest(process_content_idea),
+    "research": _ingest(process_with_research),
+    "list": _list,
+    "view": manage.get_idea,
+    "approve": manage.approve_idea,
+    "reject": manage.reject_idea,
+    "ping": _ping,
+}
+
+_workers = ThreadPoolExecutor(max_workers=WORKER_THREADS, thread_name_prefix="pipeline")
+
+def handle(request: Dict) -> Dict:
+    """Run one request on the worker pool and wrap the outcome"""
+    op = request.get("op")
+    if op not in OPS:
+        return {"ok": False, "error": f"Unknown op: {op} (choose from {', '.join(OPS)})"}
+    try:
+        result = _workers.submit(OPS[op], **request.get("args", {})).result()
+    except Exception as e:
+        return {"ok": False, "error": f"{type(e).__name__}: {e}"}
+    return {"ok": True, "result": result}
+
+class RequestHandler(socketserver.StreamRequestHandler):
+    """Any number of JSON-line requests per connection"""
+
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+            except ValueError as e:
+                response = {"ok": False, "error": f"Invalid JSON: {e}"}
+            else:
+                response = handle(request)
+            self.wfile.write(json.dumps(response).encode("utf-8") + b"\n")
+            self.wfile.flush()
+
+class PipelineServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+def warm_up():
+    """Pay the one-time costs before the first request"""
+    pipeline.init_db()
+    backend = embeddings.get_backend()
+    pipeline.load_candidates(backend.model)
+    gemini_client.get_session()
+    _reembed_if_stale()
+
+def _remove_stale_socket(path: str):
+    """Delete a socket file left by a dead daemon; refuse to start over a live one"""
+    if not os.path.exists(path):
+        return
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+        try:
+            probe.connect(path)
+        except (ConnectionRefusedError, FileNotFoundError):
+            os.unlink(path)
+            return
+    raise Exception(f"A pipeline daemon is already listening on {path}")
+
+def serve(path: str = SOCKET_PATH):
+    """Serve until SIGINT/SIGTERM"""
+    warm_up()
+    _remove_stale_socket(path)
+
+    old_umask = os.umask(0o177)  # socket is owner-only (rw-------)
+    try:
+        server = PipelineServer(path, RequestHandler)
+    finally:
+        os.umask(old_umask)
+
+    def stop(signum, frame):
+        threading.Thread(target=server.shutdown).start()
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    print(f"🚀 Pipeline daemon listening on {path} (pid {os.getpid()})", flush=True)
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        if os.path.exists(path):
+            os.unlink(path)
+        _workers.shutdown(wait=True)
+        print("👋 Pipeline daemon stopped", flush=True)
+
+if __name__ == "__main__":
+    serve(sys.argv[1] if len(sys.argv) > 1 else SOCKET_PATH)
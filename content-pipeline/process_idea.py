@@ -5,9 +5,10 @@ Main pipeline orchestrator - call this from OpenClaw
 
 import sys
 import json
+from typing import Dict
 from pipeline import (
     init_db, check_duplicates, save_idea, create_task,
-    get_embedding, format_research_results
+    get_embedding, format_research_results, start_reembed_process
 )
 
 def process_content_idea(topic: str, idea_type: str = "short") -> Dict:
@@ -37,7 +38,8 @@ def process_content_idea(topic: str, idea_type: str = "short") -> Dict:
     }
     
     # Step 2: Dedupe check (research will be done by OpenClaw)
-    is_duplicate, similar = check_duplicates(idea)
+    # Only the verdict matters here, so stop at the first match
+    is_duplicate, similar = check_duplicates(idea, mode="first")
     
     if is_duplicate:
         return {
@@ -46,7 +48,7 @@ def process_content_idea(topic: str, idea_type: str = "short") -> Dict:
             "duplicate": True,
             "matches": similar,
             "task_file": None,
-            "message": f"❌ Duplicate detected! {len(similar)} similar idea(s) found."
+            "message": f"❌ Duplicate detected! Similar to [{similar[0]['id']}] {similar[0]['title']}"
         }
     
     # Step 3: Save idea
@@ -83,4 +85,7 @@ if __name__ == "__main__":
     idea_type = sys.argv[2] if len(sys.argv) > 2 else "short"
     
     result = process_content_idea(topic, idea_type)
-    print(json.dumps(result, indent=2))
+    print(json.dumps(result, indent=2), flush=True)
+    
+    # A background thread would die with this process: migrate in a detached one
+    start_reembed_process()
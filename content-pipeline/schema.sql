@@ -10,11 +10,139 @@ CREATE TABLE IF NOT EXISTS content_ideas (
   tags TEXT,                     -- comma-separated
   status TEXT DEFAULT 'pitched', -- pitched/accepted/rejected/archived/duplicate
   response TEXT,                 -- your feedback
-  embedding BLOB,                -- vector from Gemini
+  embedding BLOB,                -- vector from Gemini (see embedding_format)
+  embedding_format INTEGER DEFAULT 0, -- 0 = JSON text (legacy), 1 = little-endian float32
+  embedding_model TEXT,          -- backend model that produced the embedding
+  title_tokens TEXT,             -- pre-tokenized for keyword dedupe (space-joined)
+  summary_tokens TEXT,           -- pre-tokenized for keyword dedupe (space-joined)
+  tag_tokens TEXT,               -- distinct tags (comma-joined)
   created_at DATETIME DEFAULT CURRENT_TIMESTAMP
 );
 
--- Index for faster similarity searches
-CREATE INDEX IF NOT EXISTS idx_status ON content_ideas(status);
-CREATE INDEX IF NOT EXISTS idx_date ON content_ideas(date);
+-- Listing order is (date DESC, id DESC), optionally filtered by status;
+-- these also serve the keyset cursor of manage.list_ideas
+CREATE INDEX IF NOT EXISTS idx_status_date_id ON content_ideas(status, date, id);
+CREATE INDEX IF NOT EXISTS idx_date_id ON content_ideas(date, id);
 CREATE INDEX IF NOT EXISTS idx_slug ON content_ideas(slug);
+
+-- Full-text index over title/summary/tags for the keyword dedupe prefilter
+CREATE VIRTUAL TABLE IF NOT EXISTS content_ideas_fts USING fts5(
+  id UNINDEXED, title, summary, tags
+);
+
+-- Keep content_ideas_fts in sync with content_ideas
+CREATE TRIGGER IF NOT EXISTS content_ideas_fts_insert AFTER INSERT ON content_ideas BEGIN
+  INSERT INTO content_ideas_fts (id, title, summary, tags)
+  VALUES (new.id, new.title, new.summary, new.tags);
+END;
+
+CREATE TRIGGER IF NOT EXISTS content_ideas_fts_delete AFTER DELETE ON content_ideas BEGIN
+  DELETE FROM content_ideas_fts WHERE id = old.id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS content_ideas_fts_update AFTER UPDATE OF id, title, summary, tags ON content_ideas BEGIN
+  DELETE FROM content_ideas_fts WHERE id = old.id;
+  INSERT INTO content_ideas_fts (id, title, summary, tags)
+  VALUES (new.id, new.title, new.summary, new.tags);
+END;
+
+-- Change counter for content_ideas, bumped by every insert/update/delete; the
+-- in-process dedupe cache (pipeline.load_candidates) reloads only when it moves
+CREATE TABLE IF NOT EXISTS content_version (
+  id INTEGER PRIMARY KEY CHECK (id = 1),
+  version INTEGER NOT NULL
+);
+
+INSERT OR IGNORE INTO content_version (id, version) VALUES (1, 0);
+
+CREATE TRIGGER IF NOT EXISTS content_ideas_version_insert AFTER INSERT ON content_ideas BEGIN
+  UPDATE content_version SET version = version + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS content_ideas_version_update AFTER UPDATE ON content_ideas BEGIN
+  UPDATE content_version SET version = version + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS content_ideas_version_delete AFTER DELETE ON content_ideas BEGIN
+  UPDATE content_version SET version = version + 1;
+END;
+
+-- Per-day ID sequence, bumped atomically by pipeline.get_next_id
+CREATE TABLE IF NOT EXISTS id_counters (
+  date TEXT PRIMARY KEY,         -- YYYY-MM-DD
+  last_seq INTEGER NOT NULL      -- last NNN handed out
+);
+
+-- Embedding cache: content-addressed by model + sha256 of normalized text
+CREATE TABLE IF NOT EXISTS embedding_cache (
+  model TEXT NOT NULL,
+  text_hash TEXT NOT NULL,
+  embedding BLOB NOT NULL,       -- little-endian float32
+  created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+  PRIMARY KEY (model, text_hash)
+);
+
+-- Progress of resumable background workers (e.g. pipeline.py reembed)
+CREATE TABLE IF NOT EXISTS worker_checkpoints (
+  name TEXT PRIMARY KEY,
+  model TEXT,                    -- embedding model the run targets
+  position INTEGER NOT NULL,     -- last content_ideas rowid committed
+  updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Script generation jobs (script_generator.py): one row per approval; failed
+-- attempts are re-queued with backoff until MAX_JOB_ATTEMPTS
+CREATE TABLE IF NOT EXISTS generation_jobs (
+  id INTEGER PRIMARY KEY,
+  idea_id TEXT NOT NULL,
+  status TEXT NOT NULL DEFAULT 'queued', -- queued/running/done/failed
+  attempts INTEGER NOT NULL DEFAULT 0,
+  last_error TEXT,
+  queued_at REAL NOT NULL,       -- unix time
+  next_attempt_at REAL NOT NULL, -- not picked up before this (backoff)
+  started_at REAL,               -- start of the latest attempt
+  finished_at REAL,
+  script_file TEXT
+);
+
+-- At most one live job per idea
+CREATE UNIQUE INDEX IF NOT EXISTS idx_generation_jobs_active
+  ON generation_jobs(idea_id) WHERE status IN ('queued', 'running');
+CREATE INDEX IF NOT EXISTS idx_generation_jobs_status
+  ON generation_jobs(status, next_attempt_at);
+
+-- Gemini generation responses, content-addressed by model + config + prompt
+-- (script_generator.cache_key); least recently used rows are evicted once
+-- the total size passes LLM_CACHE_MAX_BYTES
+CREATE TABLE IF NOT EXISTS llm_cache (
+  key TEXT PRIMARY KEY,          -- sha256 of the request
+  model TEXT NOT NULL,
+  response TEXT NOT NULL,
+  size INTEGER NOT NULL,         -- bytes of response (UTF-8)
+  created_at REAL NOT NULL,      -- unix time
+  last_used_at REAL NOT NULL,
+  hits INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE INDEX IF NOT EXISTS idx_llm_cache_last_used ON llm_cache(last_used_at);
+
+-- One row per embedding/generation call, for manage.py stats: every Gemini
+-- HTTP request (gemini_client.post), local embedding calls and embedding cache hits
+CREATE TABLE IF NOT EXISTS api_calls (
+  id INTEGER PRIMARY KEY,
+  created_at REAL NOT NULL,      -- unix time
+  kind TEXT NOT NULL,            -- 'embed' or 'generate'
+  backend TEXT,                  -- 'gemini', 'hash', 'local', ... or 'cache' (served from the embedding cache)
+  endpoint TEXT NOT NULL,        -- model:method, e.g. gemini-2.0-flash:generateContent
+  status INTEGER,                -- HTTP status (NULL: not HTTP, or connection error / timeout)
+  retries INTEGER NOT NULL DEFAULT 0, -- attempts before the final one
+  items INTEGER,                 -- texts embedded by a local/cache call
+  latency_ms REAL NOT NULL,      -- final attempt
+  total_ms REAL NOT NULL,        -- whole call: rate limiting, backoff, retries (and the stream)
+  prompt_tokens INTEGER,         -- from usageMetadata, when the API reports it
+  output_tokens INTEGER,
+  total_tokens INTEGER,
+  error TEXT
+);
+
+CREATE INDEX IF NOT EXISTS idx_api_calls_created ON api_calls(created_at);
@@ -0,0 +1,8 @@
+#!/usr/bin/env python3
+"""
+Database schema version (PRAGMA user_version) this code expects
+Kept free of imports so lightweight modules can check it without loading pipeline.py
+"""
+
+# One per entry of pipeline.MIGRATIONS; bump together with a new migration
+SCHEMA_VERSION = 7
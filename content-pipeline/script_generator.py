@@ -5,26 +5,58 @@ Uses Gemini Flash for cost-effective script generation
 """
 
 import os
-import sqlite3
 import json
-import requests
+import time
+import hashlib
+import random
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterator, List, Optional
 from dotenv import load_dotenv
+import db
+import gemini_client
+from schema_version import SCHEMA_VERSION
 
 load_dotenv(os.path.join(os.path.dirname(__file__), ".env"))
 
-DB_PATH = os.path.join(os.path.dirname(__file__), "ideas.db")
+DB_PATH = db.DB_PATH
 SCRIPTS_DIR = os.path.join(os.path.dirname(__file__), "scripts")
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY", "")
 
-def generate_script(idea_id: str) -> dict:
+GENERATE_MODEL = "gemini-2.0-flash"
+GENERATION_CONFIG = {
+    "temperature": 0.7,
+    "topK": 40,
+    "topP": 0.95,
+    "maxOutputTokens": 8192,
+}
+
+# Concurrent generations in approve-batch (Gemini calls are also rate limited
+# by gemini_client's token bucket, GEMINI_GENERATE_RPM)
+GENERATE_WORKERS = int(os.getenv("GENERATE_WORKERS", "4"))
+
+# generation_jobs: attempts before a job is marked failed, retry backoff
+# (exponential with jitter), and when a 'running' job counts as abandoned
+MAX_JOB_ATTEMPTS = int(os.getenv("MAX_JOB_ATTEMPTS", "5"))
+JOB_BACKOFF_BASE = 30.0
+JOB_BACKOFF_MAX = 3600.0
+JOB_STALE_AFTER = 900.0
+JOB_POLL_SECONDS = 5.0
+
+# Response cache (llm_cache table), keyed by model + generation config + prompt.
+# LLM_CACHE: "on" (read + write), "refresh" (write only), "off"; the CLI's
+# --refresh / --no-cache flags override it
+LLM_CACHE = os.getenv("LLM_CACHE", "on")
+LLM_CACHE_MAX_BYTES = int(os.getenv("LLM_CACHE_MAX_BYTES", str(50 * 1024 * 1024)))
+
+def generate_script(idea_id: str, stream: bool = False) -> dict:
     """
     Generate script for an approved idea
+    stream=True writes the script as it is generated (see write_script_streaming)
     Returns: {success, script_file, error}
     """
     
     # Get idea from database
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
+    cursor = db.get_connection().cursor()
     
     cursor.execute("""
         SELECT id, type, title, summary, tags, status
@@ -33,7 +65,6 @@ def generate_script(idea_id: str) -> dict:
     """, (idea_id,))
     
     result = cursor.fetchone()
-    conn.close()
     
     if not result:
         return {"success": False, "error": f"Idea {idea_id} not found"}
@@ -57,17 +88,23 @@ def generate_script(idea_id: str) -> dict:
     print(f"🎬 Generating script for: {idea['title']}")
     
     prompt = build_script_prompt(idea)
+    
+    # Save script file
+    os.makedirs(SCRIPTS_DIR, exist_ok=True)
+    script_file = script_path(idea_id)
+    
+    if stream:
+        return write_script_streaming(idea, prompt, script_file)
+    
     script_content = call_gemini(prompt)
     
     if not script_content:
         return {"success": False, "error": "Failed to generate script"}
     
-    # Save script file
-    os.makedirs(SCRIPTS_DIR, exist_ok=True)
-    script_file = os.path.join(SCRIPTS_DIR, f"{idea_id}-script.md")
-    
-    with open(script_file, 'w') as f:
+    # Write then rename: a script file that exists is always complete
+    with open(f"{script_file}.partial", 'w') as f:
         f.write(generate_script_markdown(idea, script_content))
+    os.replace(f"{script_file}.partial", script_file)
     
     print(f"✅ Script saved: {script_file}")
     
@@ -77,6 +114,10 @@ def generate_script(idea_id: str) -> dict:
         "idea": idea
     }
 
+def script_path(idea_id: str) -> str:
+    """Where an idea's script is written"""
+    return os.path.join(SCRIPTS_DIR, f"{idea_id}-script.md")
+
 def build_script_prompt(idea: dict) -> str:
     """Build prompt for script generation"""
     
@@ -121,41 +162,186 @@ Format your response in clear markdown with headers. Be specific and actionable.
     
     return prompt
 
+def cache_key(prompt: str) -> str:
+    """Content address of a generation request: model + config + prompt"""
+    request = json.dumps({"model": GENERATE_MODEL, "config": GENERATION_CONFIG, "prompt": prompt}, sort_keys=True)
+    return hashlib.sha256(request.encode("utf-8")).hexdigest()
+
+def cache_get(prompt: str) -> Optional[str]:
+    """Cached response for this exact request, if any (and LLM_CACHE reads are on)"""
+    if LLM_CACHE != "on" or not GEMINI_API_KEY:
+        return None
+    _ensure_schema()
+    key = cache_key(prompt)
+    with db.transaction() as conn:
+        row = conn.execute("SELECT response FROM llm_cache WHERE key = ?", (key,)).fetchone()
+        if row:
+            conn.execute("""
+                UPDATE llm_cache SET last_used_at = ?, hits = hits + 1 WHERE key = ?
+            """, (time.time(), key))
+    return row[0] if row else None
+
+def cache_put(prompt: str, response: str):
+    """Store a response, then evict least recently used ones above LLM_CACHE_MAX_BYTES"""
+    if LLM_CACHE == "off" or not GEMINI_API_KEY:
+        return
+    _ensure_schema()
+    now = time.time()
+    with db.transaction() as conn:
+        conn.execute("""
+            INSERT OR REPLACE INTO llm_cache (key, model, response, size, created_at, last_used_at, hits)
+            VALUES (?, ?, ?, ?, ?, ?, 0)
+        """, (cache_key(prompt), GENERATE_MODEL, response, len(response.encode("utf-8")), now, now))
+        
+        excess = conn.execute("SELECT COALESCE(SUM(size), 0) FROM llm_cache").fetchone()[0] - LLM_CACHE_MAX_BYTES
+        if excess > 0:
+            evict = []
+            for key, size in conn.execute("SELECT key, size FROM llm_cache ORDER BY last_used_at"):
+                if excess <= 0:
+                    break
+                evict.append((key,))
+                excess -= size
+            conn.executemany("DELETE FROM llm_cache WHERE key = ?", evict)
+
 def call_gemini(prompt: str) -> str:
-    """Call Gemini API for script generation"""
+    """Call Gemini API for script generation (through the llm_cache response cache)"""
     
     if not GEMINI_API_KEY:
         return "Mock script content (GEMINI_API_KEY not set)"
     
-    url = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-2.0-flash:generateContent?key={GEMINI_API_KEY}"
+    cached = cache_get(prompt)
+    if cached is not None:
+        print("♻️  Using cached response")
+        return cached
+    
+    url = f"{gemini_client.API_BASE}/models/{GENERATE_MODEL}:generateContent?key={GEMINI_API_KEY}"
     
-    headers = {"Content-Type": "application/json"}
     data = {
         "contents": [{
             "parts": [{"text": prompt}]
         }],
-        "generationConfig": {
-            "temperature": 0.7,
-            "topK": 40,
-            "topP": 0.95,
-            "maxOutputTokens": 8192,
-        }
+        "generationConfig": GENERATION_CONFIG
     }
     
-    response = requests.post(url, headers=headers, json=data)
+    response = gemini_client.post(url, data, kind="generate")
     
     if response.status_code != 200:
         print(f"⚠️  Gemini API error: {response.text}")
         return None
     
     result = response.json()
-    return result["candidates"][0]["content"]["parts"][0]["text"]
+    text = result["candidates"][0]["content"]["parts"][0]["text"]
+    cache_put(prompt, text)
+    return text
 
-def generate_script_markdown(idea: dict, script: str) -> str:
-    """Format script as markdown file"""
+def stream_gemini(prompt: str, usage: Dict = None) -> Iterator[str]:
+    """
+    Yield script text as Gemini generates it (streamGenerateContent, SSE)
+    The last usageMetadata seen (token counts) is copied into `usage`.
+    Raises on an API error; a dropped stream raises from requests mid-way.
+    A cached response is yielded in one piece; a completed stream is cached.
+    """
     
-    from datetime import datetime
+    if not GEMINI_API_KEY:
+        yield "Mock script content "
+        yield "(GEMINI_API_KEY not set)"
+        return
+    
+    cached = cache_get(prompt)
+    if cached is not None:
+        print("♻️  Using cached response")
+        yield cached
+        return
+    
+    url = f"{gemini_client.API_BASE}/models/{GENERATE_MODEL}:streamGenerateContent?alt=sse&key={GEMINI_API_KEY}"
+    
+    data = {
+        "contents": [{
+            "parts": [{"text": prompt}]
+        }],
+        "generationConfig": GENERATION_CONFIG
+    }
+    
+    response = gemini_client.post(url, data, kind="generate", stream=True)
+    if usage is None:
+        usage = {}
+    
+    with response:
+        if response.status_code != 200:
+            raise Exception(f"Gemini API error: {response.text}")
+        
+        # Each event is one "data: {GenerateContentResponse}" line
+        parts = []
+        for line in response.iter_lines(decode_unicode=True):
+            if not line or not line.startswith("data:"):
+                continue
+            chunk = json.loads(line[5:])
+            if "usageMetadata" in chunk:
+                usage.update(chunk["usageMetadata"])
+            for candidate in chunk.get("candidates", [])[:1]:
+                for part in candidate.get("content", {}).get("parts", []):
+                    if part.get("text"):
+                        parts.append(part["text"])
+                        yield part["text"]
+    
+    gemini_client.record_usage(response, usage)
+    if parts:
+        cache_put(prompt, "".join(parts))
+
+def write_script_streaming(idea: dict, prompt: str, script_file: str) -> dict:
+    """
+    Stream a script into `script_file`.partial (echoing it to the terminal),
+    then rename it into place, so the final file is only ever complete.
+    On failure the .partial file is kept with whatever arrived.
+    Returns: {success, script_file, ttft_ms, tokens, tokens_per_sec, error}
+    """
     
+    partial_file = f"{script_file}.partial"
+    usage = {}
+    started = time.perf_counter()
+    first_token = None
+    
+    try:
+        with open(partial_file, 'w') as f:
+            f.write(script_header(idea))
+            for text in stream_gemini(prompt, usage):
+                if first_token is None:
+                    first_token = time.perf_counter()
+                f.write(text)
+                f.flush()
+                print(text, end="", flush=True)
+            f.write(script_footer(idea))
+        print()
+    except Exception as e:
+        print(f"\n⚠️  Script generation failed: {e}")
+        return {"success": False, "error": str(e), "partial_file": partial_file}
+    
+    if first_token is None:
+        return {"success": False, "error": "Failed to generate script", "partial_file": partial_file}
+    
+    os.replace(partial_file, script_file)
+    
+    finished = time.perf_counter()
+    tokens = usage.get("candidatesTokenCount")
+    generating = finished - first_token
+    stats = {
+        "ttft_ms": round((first_token - started) * 1000, 1),
+        "tokens": tokens,
+        "tokens_per_sec": round(tokens / generating, 1) if tokens and generating > 0 else None,
+    }
+    
+    print(f"✅ Script saved: {script_file}")
+    print(f"⏱️  First token {stats['ttft_ms']} ms | {stats['tokens']} tokens | {stats['tokens_per_sec']} tokens/s")
+    
+    return {
+        "success": True,
+        "script_file": script_file,
+        "idea": idea,
+        **stats
+    }
+
+def script_header(idea: dict) -> str:
+    """Markdown above the generated script"""
     return f"""# {idea['title']}
 
 **ID:** {idea['id']}
@@ -165,7 +351,14 @@ def generate_script_markdown(idea: dict, script: str) -> str:
 
 ---
 
-{script}
+"""
+
+def script_footer(idea: dict) -> str:
+    """Markdown below the generated script"""
+    
+    from datetime import datetime
+    
+    return f"""
 
 ---
 
@@ -173,55 +366,340 @@ def generate_script_markdown(idea: dict, script: str) -> str:
 *Source Brief: tasks/{idea['id']}.md*
 """
 
-def approve_and_generate(idea_id: str) -> dict:
+def generate_script_markdown(idea: dict, script: str) -> str:
+    """Format script as markdown file"""
+    return script_header(idea) + script + script_footer(idea)
+
+_schema_checked = False
+
+def _ensure_schema():
+    """Older databases get generation_jobs/llm_cache from the pipeline's schema migrations"""
+    global _schema_checked
+    if _schema_checked:
+        return
+    version = db.get_connection().execute("PRAGMA user_version").fetchone()[0]
+    if version < SCHEMA_VERSION:
+        from pipeline import init_db
+        init_db()
+    _schema_checked = True
+
+def enqueue_job(idea_id: str, conn=None) -> int:
+    """Queue a generation job for an idea (reuses its live job if there is one); returns the job id"""
+    _ensure_schema()
+    conn = conn or db.get_connection()
+    now = time.time()
+    row = conn.execute("""
+        INSERT INTO generation_jobs (idea_id, queued_at, next_attempt_at)
+        VALUES (?, ?, ?)
+        ON CONFLICT (idea_id) WHERE status IN ('queued', 'running') DO NOTHING
+        RETURNING id
+    """, (idea_id, now, now)).fetchone()
+    if row:
+        return row[0]
+    return conn.execute("""
+        SELECT id FROM generation_jobs
+        WHERE idea_id = ? AND status IN ('queued', 'running')
+    """, (idea_id,)).fetchone()[0]
+
+def claim_job(job_id: int = None) -> Optional[Dict]:
+    """
+    Mark the next due queued job (or `job_id`) as running and return it
+    Jobs left 'running' by a crashed worker are re-queued first
+    """
+    _ensure_schema()
+    now = time.time()
+    with db.transaction() as conn:
+        conn.execute("""
+            UPDATE generation_jobs
+            SET status = 'queued', last_error = 'worker stopped mid-job'
+            WHERE status = 'running' AND started_at < ?
+        """, (now - JOB_STALE_AFTER,))
+        
+        if job_id is not None:
+            row = conn.execute("""
+                SELECT id, idea_id, attempts FROM generation_jobs
+                WHERE id = ? AND status = 'queued'
+            """, (job_id,)).fetchone()
+        else:
+            row = conn.execute("""
+                SELECT id, idea_id, attempts FROM generation_jobs
+                WHERE status = 'queued' AND next_attempt_at <= ?
+                ORDER BY next_attempt_at, id
+                LIMIT 1
+            """, (now,)).fetchone()
+        if not row:
+            return None
+        
+        conn.execute("""
+            UPDATE generation_jobs
+            SET status = 'running', attempts = attempts + 1, started_at = ?
+            WHERE id = ?
+        """, (now, row[0]))
+    
+    return {"id": row[0], "idea_id": row[1], "attempts": row[2] + 1}
+
+def _job_backoff(attempts: int) -> float:
+    """Seconds before retry number `attempts` (exponential, half jitter)"""
+    delay = min(JOB_BACKOFF_MAX, JOB_BACKOFF_BASE * (2 ** (attempts - 1)))
+    return delay / 2 + random.uniform(0, delay / 2)
+
+def run_job(job: Dict, stream: bool = False) -> dict:
+    """Generate the script for a claimed job and record the outcome"""
+    try:
+        result = generate_script(job["idea_id"], stream=stream)
+    except Exception as e:
+        result = {"success": False, "error": str(e)}
+    
+    now = time.time()
+    with db.transaction() as conn:
+        if result["success"]:
+            conn.execute("""
+                UPDATE generation_jobs
+                SET status = 'done', finished_at = ?, script_file = ?, last_error = NULL
+                WHERE id = ?
+            """, (now, result["script_file"], job["id"]))
+        elif job["attempts"] >= MAX_JOB_ATTEMPTS:
+            conn.execute("""
+                UPDATE generation_jobs
+                SET status = 'failed', finished_at = ?, last_error = ?
+                WHERE id = ?
+            """, (now, result.get("error"), job["id"]))
+        else:
+            retry_at = now + _job_backoff(job["attempts"])
+            conn.execute("""
+                UPDATE generation_jobs
+                SET status = 'queued', next_attempt_at = ?, last_error = ?
+                WHERE id = ?
+            """, (retry_at, result.get("error"), job["id"]))
+            result["retry_at"] = retry_at
+    
+    result["job_id"] = job["id"]
+    return result
+
+def work(once: bool = False, poll: float = JOB_POLL_SECONDS) -> int:
+    """
+    Worker loop: run due jobs until interrupted (once=True: until none is due)
+    Returns the number of jobs run
+    """
+    ran = 0
+    while True:
+        job = claim_job()
+        if job is None:
+            if once:
+                return ran
+            time.sleep(poll)
+            continue
+        print(f"🔧 Job {job['id']}: {job['idea_id']} (attempt {job['attempts']}/{MAX_JOB_ATTEMPTS})")
+        run_job(job)
+        ran += 1
+
+def job_stats() -> dict:
+    """Jobs per status, plus latency and throughput of finished jobs"""
+    _ensure_schema()
+    conn = db.get_connection()
+    counts = dict(conn.execute("SELECT status, COUNT(*) FROM generation_jobs GROUP BY status").fetchall())
+    
+    rows = conn.execute("""
+        SELECT finished_at - started_at, finished_at - queued_at, attempts, finished_at
+        FROM generation_jobs
+        WHERE status = 'done'
+        ORDER BY finished_at
+    """).fetchall()
+    
+    def percentile(values, pct):
+        values = sorted(values)
+        return round(values[min(int(len(values) * pct / 100), len(values) - 1)], 2) if values else None
+    
+    span = rows[-1][3] - rows[0][3] if len(rows) > 1 else 0
+    return {
+        "jobs": counts,
+        "run_seconds_p50": percentile([r[0] for r in rows], 50),
+        "run_seconds_p95": percentile([r[0] for r in rows], 95),
+        "queue_to_done_seconds_p50": percentile([r[1] for r in rows], 50),
+        "queue_to_done_seconds_p95": percentile([r[1] for r in rows], 95),
+        "avg_attempts": round(sum(r[2] for r in rows) / len(rows), 2) if rows else None,
+        "done_per_hour": round(len(rows) / span * 3600, 1) if span else None,
+    }
+
+def approve_and_generate(idea_id: str, stream: bool = False) -> dict:
     """
     Approve an idea and generate its script
-    Two-step process: update status → generate script
+    Approval and the generation job are committed together, then the job runs
+    right away; if generation fails the job stays queued for `worker` to retry.
+    An accepted idea without a script can be approved again.
     """
     
-    # Step 1: Update status to "accepted"
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
+    # Step 1: Update status to "accepted" and queue the job
+    _ensure_schema()
+    with db.transaction() as conn:
+        cursor = conn.cursor()
+        
+        cursor.execute("""
+            UPDATE content_ideas
+            SET status = 'accepted'
+            WHERE id = ? AND status = 'pitched'
+        """, (idea_id,))
+        
+        updated = cursor.rowcount
+        
+        if updated == 0:
+            row = cursor.execute("SELECT status FROM content_ideas WHERE id = ?", (idea_id,)).fetchone()
+            retry = row and row[0] == "accepted" and not os.path.exists(script_path(idea_id))
+            if not retry:
+                return {
+                    "success": False,
+                    "error": f"Idea {idea_id} not found or already processed"
+                }
+        
+        job_id = enqueue_job(idea_id, conn)
     
-    cursor.execute("""
-        UPDATE content_ideas
-        SET status = 'accepted'
-        WHERE id = ? AND status = 'pitched'
-    """, (idea_id,))
+    print(f"✅ Approved: {idea_id}")
     
-    if cursor.rowcount == 0:
-        conn.close()
-        return {
-            "success": False,
-            "error": f"Idea {idea_id} not found or already processed"
-        }
+    # Step 2: Generate script (unless a worker already has this job)
+    job = claim_job(job_id)
+    if job is None:
+        return {"success": True, "job_id": job_id, "queued": True}
+    return run_job(job, stream=stream)
+
+def select_batch(idea_ids: List[str] = None, select_all: bool = False, **filters) -> List[str]:
+    """
+    Ideas for approve_batch: the given ids, or every pitched idea matching
+    `filters` (manage.iter_ideas: idea_type, tag, since, until, limit) plus
+    accepted ones whose script was never written (an interrupted batch)
+    Without ids or filters, `select_all` must be set to take every pitched idea
+    """
+    if idea_ids:
+        return list(idea_ids)
+    if not filters and not select_all:
+        raise Exception("No ideas selected: pass idea ids, a filter or select_all=True")
+    
+    from manage import iter_ideas
+    limit = filters.pop("limit", None)
+    selected = [i["id"] for i in iter_ideas(status="pitched", **filters)]
+    selected += [
+        i["id"] for i in iter_ideas(status="accepted", **filters)
+        if not os.path.exists(script_path(i["id"]))
+    ]
+    return selected[:limit] if limit else selected
+
+def _approve_and_generate_one(idea_id: str) -> dict:
+    """approve-batch worker: skip finished ideas, approve pitched ones, run their job"""
+    started = time.perf_counter()
     
-    conn.commit()
-    conn.close()
+    if os.path.exists(script_path(idea_id)):
+        return {"idea_id": idea_id, "status": "skipped", "script_file": script_path(idea_id)}
     
-    print(f"✅ Approved: {idea_id}")
+    try:
+        result = approve_and_generate(idea_id)
+    except Exception as e:
+        result = {"success": False, "error": str(e)}
     
-    # Step 2: Generate script
-    return generate_script(idea_id)
+    return {
+        "idea_id": idea_id,
+        "status": "queued" if result.get("queued") or result.get("retry_at") else
+                  "generated" if result["success"] else "failed",
+        "script_file": result.get("script_file"),
+        "error": result.get("error"),
+        "seconds": round(time.perf_counter() - started, 2),
+    }
+
+def approve_batch(idea_ids: List[str] = None, workers: int = GENERATE_WORKERS,
+                  select_all: bool = False, **filters) -> dict:
+    """
+    Approve many ideas and generate their scripts concurrently
+    Pass ids, filters for select_batch, or select_all. Ideas whose script file exists are
+    skipped, so re-running after a crash only does the remaining work.
+    Failed generations stay queued in generation_jobs for `worker` to retry.
+    Returns: {generated, skipped, queued, failed, seconds, results: [{idea_id, status, ...}]}
+    """
+    selected = select_batch(idea_ids, select_all, **filters)
+    started = time.perf_counter()
+    
+    print(f"🎬 Generating {len(selected)} script(s) with {workers} worker(s)...")
+    results = []
+    with ThreadPoolExecutor(max_workers=max(workers, 1)) as pool:
+        for result in pool.map(_approve_and_generate_one, selected):
+            mark = {"generated": "✅", "skipped": "⏭️ ", "queued": "⏳", "failed": "❌"}[result["status"]]
+            print(f"{mark} {result['idea_id']}: {result['status']}" + (f" ({result['error']})" if result.get("error") else ""))
+            results.append(result)
+    
+    counts = {status: sum(1 for r in results if r["status"] == status) for status in ("generated", "skipped", "queued", "failed")}
+    return {
+        **counts,
+        "seconds": round(time.perf_counter() - started, 2),
+        "results": results
+    }
 
 if __name__ == "__main__":
     import sys
     
     if len(sys.argv) < 2:
         print("Usage:")
-        print("  python script_generator.py approve <idea_id>   # Approve + generate")
-        print("  python script_generator.py generate <idea_id>  # Generate only (must be approved)")
+        print("  python script_generator.py approve <idea_id> [--stream]   # Approve + generate")
+        print("  python script_generator.py generate <idea_id> [--stream]  # Generate only (must be approved)")
+        print("  python script_generator.py approve-batch [idea_id ...] [--type t] [--tag t] [--since d]")
+        print("                             [--until d] [--limit n] [--all] [--workers n]  # Approve + generate concurrently")
+        print("  python script_generator.py worker [--once]   # Run queued/retried generation jobs")
+        print("  python script_generator.py jobs              # Job counts, latency, throughput")
+        print("  Add --refresh to regenerate and re-cache, --no-cache to bypass the response cache")
         sys.exit(1)
     
-    command = sys.argv[1]
-    idea_id = sys.argv[2] if len(sys.argv) > 2 else None
+    if "--no-cache" in sys.argv:
+        LLM_CACHE = "off"
+    elif "--refresh" in sys.argv:
+        LLM_CACHE = "refresh"
+    sys.argv = [a for a in sys.argv if a not in ("--no-cache", "--refresh")]
+    
+    if sys.argv[1] == "worker":
+        print("🔧 Generation worker started")
+        try:
+            ran = work(once="--once" in sys.argv)
+        except KeyboardInterrupt:
+            sys.exit(0)
+        print(f"✅ Ran {ran} job(s)")
+        sys.exit(0)
+    
+    if sys.argv[1] == "jobs":
+        print(json.dumps(job_stats(), indent=2))
+        sys.exit(0)
+    
+    if sys.argv[1] == "approve-batch":
+        idea_ids, filters, workers, select_all = [], {}, GENERATE_WORKERS, False
+        rest = sys.argv[2:]
+        while rest:
+            arg = rest.pop(0)
+            if arg == "--all":
+                select_all = True
+            elif arg in ("--type", "--tag", "--since", "--until") and rest:
+                filters["idea_type" if arg == "--type" else arg[2:]] = rest.pop(0)
+            elif arg == "--limit" and rest:
+                filters["limit"] = int(rest.pop(0))
+            elif arg == "--workers" and rest:
+                workers = int(rest.pop(0))
+            else:
+                idea_ids.append(arg)
+        
+        if not idea_ids and not filters and not select_all:
+            print("Usage: python script_generator.py approve-batch [idea_id ...] [--type t] [--tag t] [--since d]")
+            print("                                    [--until d] [--limit n] [--all] [--workers n]")
+            print("  Pass idea ids, at least one filter, or --all for every pitched idea")
+            sys.exit(1)
+        
+        result = approve_batch(idea_ids, workers, select_all, **filters)
+        print(json.dumps(result, indent=2))
+        sys.exit(1 if result["failed"] else 0)
+    
+    stream = "--stream" in sys.argv
+    args = [a for a in sys.argv[1:] if a != "--stream"]
+    command = args[0]
+    idea_id = args[1] if len(args) > 1 else None
     
     if command == "approve" and idea_id:
-        result = approve_and_generate(idea_id)
+        result = approve_and_generate(idea_id, stream=stream)
         print(json.dumps(result, indent=2))
     
     elif command == "generate" and idea_id:
-        result = generate_script(idea_id)
+        result = generate_script(idea_id, stream=stream)
         print(json.dumps(result, indent=2))
     
     else:
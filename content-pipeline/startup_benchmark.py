@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+CLI startup benchmark
+Runs `manage.py list` / `manage.py view` under `python -X importtime` against a
+scratch database, reports wall time and import time, and fails when the
+startup budget is exceeded or a heavy module gets imported
+"""
+
+import os
+import sys
+import re
+import time
+import sqlite3
+import tempfile
+import subprocess
+from statistics import median
+from typing import Dict, List, Tuple
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Median wall-clock budget per command, interpreter start included
+STARTUP_BUDGET_MS = float(os.getenv("STARTUP_BUDGET_MS", "150"))
+
+# Modules these commands must never load
+HEAVY_MODULES = ["numpy", "requests", "urllib3", "dotenv", "gemini_client", "script_generator", "pipeline"]
+
+COMMANDS = [
+    ["manage.py", "list"],
+    ["manage.py", "list", "pitched", "50"],
+    ["manage.py", "view", "2000-01-01-001"],
+]
+
+IMPORT_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+def parse_importtime(stderr: str) -> Tuple[float, List[str]]:
+    """(total import ms from top-level entries, every module imported)"""
+    total_us, modules = 0, []
+    for line in stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if not match:
+            continue
+        _, cumulative, indent, name = match.groups()
+        modules.append(name)
+        if len(indent) == 1:  # top-level import
+            total_us += int(cumulative)
+    return total_us / 1000, modules
+
+def scratch_env() -> Dict:
+    """Environment pointing at a small, already-initialized database"""
+    workdir = tempfile.mkdtemp(prefix="ideas-startup-")
+    env = dict(os.environ, IDEAS_DB_PATH=os.path.join(workdir, "ideas.db"), IDEAS_TASKS_DIR=os.path.join(workdir, "tasks"))
+
+    subprocess.run([sys.executable, os.path.join(HERE, "pipeline.py"), "init"], env=env, check=True, capture_output=True)
+    conn = sqlite3.connect(env["IDEAS_DB_PATH"])
+    conn.executemany(
+        "INSERT INTO content_ideas (id, date, type, title, slug, summary, tags) VALUES (?, ?, ?, ?, ?, ?, ?)",
+        [(f"2000-01-01-{n:03d}", "2000-01-01", "short", f"Idea {n}", f"idea-{n}", "Summary", "bench") for n in range(1, 101)]
+    )
+    conn.commit()
+    conn.close()
+    return env
+
+def measure(command: List[str], env: Dict, runs: int) -> Dict:
+    """Median wall/import time of `command` over `runs` runs"""
+    walls, imports, modules = [], [], []
+    for _ in range(runs):
+        started = time.perf_counter()
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", os.path.join(HERE, command[0]), *command[1:]],
+            env=env, capture_output=True, text=True
+        )
+        walls.append((time.perf_counter() - started) * 1000)
+        if proc.returncode != 0:
+            raise RuntimeError(f"{' '.join(command)} failed:\n{proc.stdout}{proc.stderr}")
+        import_ms, modules = parse_importtime(proc.stderr)
+        imports.append(import_ms)
+
+    heavy = [m for m in HEAVY_MODULES if m in modules]
+    return {
+        "command": " ".join(command),
+        "wall_ms": round(median(walls), 1),
+        "import_ms": round(median(imports), 1),
+        "modules": len(modules),
+        "heavy_modules": heavy,
+        "ok": median(walls) <= STARTUP_BUDGET_MS and not heavy,
+    }
+
+if __name__ == "__main__":
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    env = scratch_env()
+
+    print(f"⏱️  Startup budget: {STARTUP_BUDGET_MS:.0f} ms (median of {runs} runs)")
+    results = [measure(command, env, runs) for command in COMMANDS]
+    for r in results:
+        mark = "✅" if r["ok"] else "❌"
+        print(f"{mark} {r['command']}: {r['wall_ms']} ms wall | {r['import_ms']} ms imports | {r['modules']} modules")
+        if r["heavy_modules"]:
+            print(f"   heavy imports: {', '.join(r['heavy_modules'])}")
+
+    if not all(r["ok"] for r in results):
+        sys.exit(1)
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Stress test for concurrent ingestion
+Runs many process_idea.py processes in parallel against one scratch ideas.db
+and checks that every idea got a unique, gap-free ID and a unique slug
+"""
+
+import os
+import sys
+import json
+import sqlite3
+import tempfile
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+def run_idea(env: dict, n: int) -> dict:
+    """Run one process_idea.py; half the ideas share a title to force slug collisions"""
+    topic = "Shared stress title | stress" if n % 2 else f"Stress idea {n} | stress"
+    proc = subprocess.run(
+        [sys.executable, os.path.join(HERE, "process_idea.py"), topic],
+        env=env, capture_output=True, text=True
+    )
+    if proc.returncode != 0:
+        return {"success": False, "error": proc.stderr.strip().splitlines()[-1:]}
+    # process_idea.py prints progress lines before the JSON result
+    output = proc.stdout
+    return json.loads(output[output.index("{"):])
+
+def stress(processes: int = 16, ideas: int = 64) -> dict:
+    """Ingest `ideas` ideas with `processes` running at once; returns a report"""
+    workdir = tempfile.mkdtemp(prefix="ideas-stress-")
+    db_path = os.path.join(workdir, "ideas.db")
+    env = dict(
+        os.environ,
+        IDEAS_DB_PATH=db_path,
+        IDEAS_TASKS_DIR=os.path.join(workdir, "tasks"),
+        DUPLICATE_THRESHOLD="2",  # disable dedupe: every idea must be written
+        GEMINI_API_KEY="",        # mock embeddings, no network
+    )
+
+    subprocess.run([sys.executable, os.path.join(HERE, "pipeline.py"), "init"],
+                   env=env, check=True, capture_output=True)
+
+    with ThreadPoolExecutor(max_workers=processes) as pool:
+        results = list(pool.map(lambda n: run_idea(env, n), range(ideas)))
+
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute("SELECT id, slug FROM content_ideas ORDER BY id").fetchall()
+    conn.close()
+
+    ids = [row[0] for row in rows]
+    slugs = [row[1] for row in rows]
+    seqs = sorted(int(i.split("-")[-1]) for i in ids)
+
+    failures = [r for r in results if not r.get("success")]
+    report = {
+        "db": db_path,
+        "processes": processes,
+        "ideas": ideas,
+        "saved": len(rows),
+        "failures": failures,
+        "unique_ids": len(set(ids)) == len(ids),
+        "unique_slugs": len(set(slugs)) == len(slugs),
+        "gap_free": seqs == list(range(1, len(seqs) + 1)),
+    }
+    report["ok"] = (
+        not failures and report["saved"] == ideas
+        and report["unique_ids"] and report["unique_slugs"] and report["gap_free"]
+    )
+    return report
+
+if __name__ == "__main__":
+    processes = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+    ideas = int(sys.argv[2]) if len(sys.argv) > 2 else 64
+
+    print(f"🔨 Ingesting {ideas} ideas with {processes} parallel processes...")
+    report = stress(processes, ideas)
+    print(json.dumps(report, indent=2))
+
+    if report["ok"]:
+        print("✅ No ID or slug collisions")
+    else:
+        print("❌ Concurrent ingestion failed")
+        sys.exit(1)
@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""
+Approximate nearest-neighbour index for idea embeddings
+IVF (inverted file) layout: vectors are clustered around k-means centroids
+and a query only scans the closest clusters
+"""
+
+import os
+import struct
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+
+# Below this many vectors a flat (exact) scan is cheaper than clustering
+MIN_TRAIN_SIZE = 1024
+
+# Number of clusters scanned per query
+DEFAULT_N_PROBE = 8
+
+# K-means iterations when (re)training the centroids
+KMEANS_ITERATIONS = 10
+
+# Delta file record header: id length (bytes), vector dimension
+DELTA_HEADER = struct.Struct("<HI")
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    """L2-normalize rows so cosine similarity becomes a dot product"""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+def index_path_for(db_path: str) -> str:
+    """Index file kept alongside the SQLite database"""
+    return os.path.splitext(db_path)[0] + ".index.npz"
+
+def delta_path_for(index_path: str) -> str:
+    """Append-only file holding vectors added since the index file was written"""
+    return os.path.splitext(index_path)[0] + ".delta"
+
+def append_delta(index_path: str, idea_id: str, vector):
+    """Append one vector to the delta file (a single O_APPEND write, O(dim))"""
+    vector = np.asarray(vector, dtype="<f4").reshape(-1)
+    key = idea_id.encode("utf-8")
+    record = DELTA_HEADER.pack(len(key), vector.shape[0]) + key + vector.tobytes()
+    fd = os.open(delta_path_for(index_path), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        os.write(fd, record)
+    finally:
+        os.close(fd)
+
+def read_delta(index_path: str) -> List[Tuple[str, np.ndarray]]:
+    """(id, vector) records of the delta file; a torn trailing record is ignored"""
+    try:
+        with open(delta_path_for(index_path), "rb") as f:
+            data = f.read()
+    except FileNotFoundError:
+        return []
+
+    records, pos = [], 0
+    while pos + DELTA_HEADER.size <= len(data):
+        key_len, dim = DELTA_HEADER.unpack_from(data, pos)
+        end = pos + DELTA_HEADER.size + key_len + 4 * dim
+        if end > len(data):
+            break
+        key_end = pos + DELTA_HEADER.size + key_len
+        records.append((data[pos + DELTA_HEADER.size:key_end].decode("utf-8"),
+                        np.frombuffer(data, dtype="<f4", count=dim, offset=key_end)))
+        pos = end
+    return records
+
+class VectorIndex:
+    """
+    IVF index over L2-normalized float32 vectors
+
+    Rows [0, n_indexed) are sorted by cluster, with cluster c stored in
+    vectors[offsets[c]:offsets[c + 1]]. Rows added after training sit in an
+    unclustered tail that every query scans; the index retrains itself once
+    the tail grows too large.
+
+    On disk the index is the .npz written by save() plus an append-only delta
+    file of rows added since; load() replays the delta, and n_delta counts
+    those rows so callers know when to fold them back in with save().
+    """
+
+    def __init__(self, dim: int, model: str = ""):
+        self.dim = dim
+        self.model = model  # embedding model the vectors came from
+        # Row buffers grow geometrically; ids/vectors are views of the filled part
+        self._ids = np.empty(0, dtype=object)
+        self._vectors = np.empty((0, dim), dtype=np.float32)
+        self._size = 0
+        self.centroids: Optional[np.ndarray] = None
+        self.offsets = np.zeros(2, dtype=np.int64)
+        self.n_indexed = 0
+        self.n_skipped = 0  # rows left out because of a dimension mismatch
+        self.n_delta = 0    # rows in the delta file, not yet in the saved index
+        self._positions: Optional[Dict[str, int]] = None  # id -> row, built on demand
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def ids(self) -> np.ndarray:
+        return self._ids[:self._size]
+
+    @ids.setter
+    def ids(self, ids):
+        self._ids = np.asarray(ids, dtype=object)
+        self._size = len(self._ids)
+
+    @property
+    def vectors(self) -> np.ndarray:
+        return self._vectors[:self._size]
+
+    @vectors.setter
+    def vectors(self, vectors):
+        self._vectors = np.asarray(vectors, dtype=np.float32)
+
+    def _grow(self):
+        """Double the row buffers so appends stay amortized O(dim)"""
+        n = self._size
+        capacity = max(2 * n, 64)
+        ids = np.empty(capacity, dtype=object)
+        ids[:n] = self._ids[:n]
+        vectors = np.empty((capacity, self.dim), dtype=np.float32)
+        vectors[:n] = self._vectors[:n]
+        self._ids, self._vectors = ids, vectors
+
+    @classmethod
+    def build(cls, ids: List[str], vectors, n_lists: Optional[int] = None) -> "VectorIndex":
+        """Build an index from scratch"""
+        vectors = normalize(vectors).reshape(len(ids), -1)
+        index = cls(vectors.shape[1])
+        index.ids = ids
+        index.vectors = vectors
+        index.train(n_lists)
+        return index
+
+    def train(self, n_lists: Optional[int] = None):
+        """Cluster all vectors (spherical k-means) and re-sort them by cluster"""
+        n = len(self.ids)
+        if n_lists is None:
+            n_lists = int(np.sqrt(n)) if n >= MIN_TRAIN_SIZE else 0
+
+        if n_lists <= 1:
+            self.centroids = None
+            self.offsets = np.array([0, n], dtype=np.int64)
+            self.n_indexed = n
+            return
+
+        # Deterministic init so rebuilds are reproducible
+        rng = np.random.default_rng(0)
+        centroids = self.vectors[rng.choice(n, n_lists, replace=False)].copy()
+        for _ in range(KMEANS_ITERATIONS):
+            assignments = np.argmax(self.vectors @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignments, self.vectors)
+            empty = ~sums.any(axis=1)
+            sums[empty] = centroids[empty]
+            centroids = normalize(sums)
+
+        assignments = np.argmax(self.vectors @ centroids.T, axis=1)
+        order = np.argsort(assignments, kind="stable")
+        self.vectors = np.ascontiguousarray(self.vectors[order])
+        self.ids = self.ids[order]
+        counts = np.bincount(assignments, minlength=n_lists)
+        self.offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+        self.centroids = centroids
+        self.n_indexed = n
+        self._positions = None
+
+    def needs_retrain(self) -> bool:
+        """True once the unclustered tail is large relative to the index"""
+        tail = len(self.ids) - self.n_indexed
+        if self.centroids is None:
+            return len(self.ids) >= MIN_TRAIN_SIZE
+        return tail > max(MIN_TRAIN_SIZE, self.n_indexed // 4)
+
+    def add(self, idea_id: str, vector) -> bool:
+        """Append a vector to the tail; returns False on dimension mismatch"""
+        vector = normalize(vector).reshape(-1)
+        if len(self.ids) == 0 and vector.shape[0] != self.dim:
+            # Empty index: adopt the dimension of the first vector
+            self.dim = vector.shape[0]
+            self._vectors = np.empty((0, self.dim), dtype=np.float32)
+        if vector.shape[0] != self.dim:
+            self.n_skipped += 1
+            return False
+
+        n = self._size
+        if n >= len(self._ids) or n >= len(self._vectors):
+            self._grow()
+        self._ids[n] = idea_id
+        self._vectors[n] = vector
+        self._size = n + 1
+        if self._positions is not None:
+            self._positions[idea_id] = n
+        if self.centroids is None:
+            self.offsets[-1] = len(self.ids)
+            self.n_indexed = len(self.ids)
+        if self.needs_retrain():
+            self.train()
+        return True
+
+    def _candidate_rows(self, query: np.ndarray, n_probe: int) -> Optional[np.ndarray]:
+        """Row numbers to scan for a query, or None to scan everything"""
+        if self.centroids is None:
+            return None
+
+        n_lists = len(self.centroids)
+        if n_probe >= n_lists:
+            return None
+
+        probes = np.argpartition(self.centroids @ query, -n_probe)[-n_probe:]
+        ranges = [np.arange(self.offsets[c], self.offsets[c + 1]) for c in probes]
+        ranges.append(np.arange(self.n_indexed, len(self.ids)))
+        return np.concatenate(ranges)
+
+    def search(self, query, k: int, n_probe: int = DEFAULT_N_PROBE) -> List[Tuple[str, float]]:
+        """Return up to k (id, cosine similarity) pairs, best first"""
+        query = normalize(query).reshape(-1)
+        if len(self.ids) == 0 or query.shape[0] != self.dim:
+            return []
+
+        rows = self._candidate_rows(query, n_probe)
+        if rows is None:
+            scores = self.vectors @ query
+            rows = np.arange(len(self.ids))
+        else:
+            scores = self.vectors[rows] @ query
+
+        k = min(k, len(scores))
+        top = np.argpartition(scores, -k)[-k:]
+        top = top[np.argsort(scores[top])[::-1]]
+        return [(str(self.ids[rows[i]]), float(scores[i])) for i in top]
+
+    def similarities(self, query, ids: List[str]) -> Dict[str, float]:
+        """Exact cosine similarity for specific ids (ids not in the index are omitted)"""
+        query = normalize(query).reshape(-1)
+        if query.shape[0] != self.dim:
+            return {}
+
+        if self._positions is None:
+            self._positions = {str(idea_id): row for row, idea_id in enumerate(self.ids)}
+        rows = [self._positions[i] for i in ids if i in self._positions]
+        if not rows:
+            return {}
+
+        scores = self.vectors[rows] @ query
+        return {str(self.ids[row]): float(score) for row, score in zip(rows, scores)}
+
+    def save(self, path: str):
+        """Write the whole index atomically (temp file + rename) and empty the delta file"""
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(
+                f,
+                dim=np.int64(self.dim),
+                model=np.array(self.model),
+                ids=self.ids.astype(str),
+                vectors=self.vectors,
+                centroids=self.centroids if self.centroids is not None else np.empty((0, self.dim), dtype=np.float32),
+                offsets=self.offsets,
+                n_indexed=np.int64(self.n_indexed),
+                n_skipped=np.int64(self.n_skipped),
+            )
+        os.replace(tmp_path, path)
+        try:
+            os.remove(delta_path_for(path))
+        except FileNotFoundError:
+            pass
+        self.n_delta = 0
+
+    @classmethod
+    def load(cls, path: str) -> Optional["VectorIndex"]:
+        """Load an index from disk (saved index + delta file); None if missing or unreadable"""
+        if not os.path.exists(path):
+            return None
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                index = cls(int(data["dim"]), str(data["model"]))
+                index.ids = data["ids"]
+                index.vectors = data["vectors"]
+                centroids = data["centroids"]
+                index.centroids = centroids if len(centroids) else None
+                index.offsets = data["offsets"]
+                index.n_indexed = int(data["n_indexed"])
+                index.n_skipped = int(data["n_skipped"])
+        except (OSError, KeyError, ValueError):
+            return None
+
+        for idea_id, vector in read_delta(path):
+            index.add(idea_id, vector)
+            index.n_delta += 1
+        return index